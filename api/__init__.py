@@ -1,12 +1,27 @@
 import os
 from flask import Flask
 
-from api.indicators_controller import get_ratios, get_company, get_dividends
+from api.http_cache import conditional
+from api.indicators_controller import (
+    company_dependencies,
+    dividends_dependencies,
+    indicators_dependencies,
+    ratios_dependencies,
+    get_ratios,
+    get_batch_ratios,
+    get_company,
+    get_dividends,
+    get_indicators,
+)
 from api.financials_controller import (
+    statements_dependencies,
     get_income_statements,
     get_balance_sheets,
     get_cash_flows,
 )
+from api.screens_controller import run_screen
+from src.statements import BALANCE_SHEET, CASH_FLOW, INCOME_STATEMENT
+from src.warmer import cache_warmer, WARMER_ENABLED
 
 
 # Initiate the Flask app
@@ -18,36 +33,60 @@ API_V1 = "/api/v1"
 
 
 app.add_url_rule(
-    f"{API_V1}/ticker/<symbol>/ratios", methods=["GET"], view_func=get_ratios
+    f"{API_V1}/ticker/<symbol>/ratios",
+    methods=["GET"],
+    view_func=conditional(ratios_dependencies)(get_ratios),
 )
 
 app.add_url_rule(
-    f"{API_V1}/ticker/<symbol>/company", methods=["GET"], view_func=get_company
+    f"{API_V1}/tickers/ratios", methods=["GET", "POST"], view_func=get_batch_ratios
 )
 
 app.add_url_rule(
-    f"{API_V1}/ticker/<symbol>/dividends", methods=["GET"], view_func=get_dividends
+    f"{API_V1}/ticker/<symbol>/company",
+    methods=["GET"],
+    view_func=conditional(company_dependencies)(get_company),
+)
+
+app.add_url_rule(
+    f"{API_V1}/ticker/<symbol>/dividends",
+    methods=["GET"],
+    view_func=conditional(dividends_dependencies)(get_dividends),
+)
+
+app.add_url_rule(
+    f"{API_V1}/ticker/<symbol>/indicators",
+    methods=["GET"],
+    view_func=conditional(indicators_dependencies)(get_indicators),
 )
 
 app.add_url_rule(
     f"{API_V1}/ticker/<symbol>/income-statements",
     methods=["GET"],
-    view_func=get_income_statements,
+    view_func=conditional(statements_dependencies(INCOME_STATEMENT))(
+        get_income_statements
+    ),
 )
 
 app.add_url_rule(
     f"{API_V1}/ticker/<symbol>/balance-sheets",
     methods=["GET"],
-    view_func=get_balance_sheets,
+    view_func=conditional(statements_dependencies(BALANCE_SHEET))(get_balance_sheets),
 )
 
 app.add_url_rule(
     f"{API_V1}/ticker/<symbol>/cash-flows",
     methods=["GET"],
-    view_func=get_cash_flows,
+    view_func=conditional(statements_dependencies(CASH_FLOW))(get_cash_flows),
 )
 
+app.add_url_rule(f"{API_V1}/screens", methods=["POST"], view_func=run_screen)
+
 if __name__ == "__main__":
+    # The reloader runs the app in a child process, only that one warms
+    if WARMER_ENABLED and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        cache_warmer.start()
+
     app.run(
         debug=True,
         host="0.0.0.0",
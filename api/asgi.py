@@ -0,0 +1,303 @@
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List
+import asyncio
+import json
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from api.financials_controller import (
+    balance_sheets_body,
+    cash_flows_body,
+    income_statements_body,
+    parse_statements_args,
+    statements_dependencies,
+)
+from api.http_cache import get_validators, resource_name
+from api.indicators_controller import (
+    batch_dependencies,
+    company_dependencies,
+    dividends_dependencies,
+    indicators_dependencies,
+    ratios_dependencies,
+    company_body,
+    compute_ratios,
+    dividends_body,
+    indicators_body,
+    parse_batch_args,
+    parse_indicators_args,
+    ratio_modules,
+    BATCH_WORKERS,
+    DIVIDEND_RATIOS,
+    RATIOS,
+)
+from api.screens_controller import screen_body
+from api.streaming import aiter_completed, STREAM_FORMATS
+from src.async_yahoo_finance import AsyncYahooFinance
+from src.statements import BALANCE_SHEET, CASH_FLOW, INCOME_STATEMENT, PERIODS
+from src.warmer import cache_warmer, WARMER_ENABLED
+
+
+# Upstream requests run on the event loop, building the bodies from the warm
+# cache runs in the thread pool with the same code as the Flask app
+yahoo_finance = AsyncYahooFinance()
+
+
+API_V1 = "/api/v1"
+
+
+def endpoint(
+    handler: Callable[[Request], Awaitable[Any]],
+    dependencies: Callable[[str, dict], Dict[str, Any]] = None,
+):
+    """
+    Wraps a handler returning a response body. With `dependencies`, the route
+    is served with the HTTP validators of the Flask app, see api.http_cache.
+    """
+
+    async def wrapper(request: Request) -> Response:
+        try:
+            validators, deps = None, None
+            if dependencies is not None:
+                symbol = request.path_params["symbol"]
+                resource = resource_name(request.url.path, request.url.query)
+
+                try:
+                    deps = await run_in_threadpool(
+                        dependencies, symbol, request.query_params
+                    )
+                except Exception:
+                    # Invalid arguments are reported by the handler
+                    pass
+
+            conditions = (
+                request.headers.get("if-none-match"),
+                request.headers.get("if-modified-since"),
+            )
+
+            if deps is not None:
+                cache_warmer.record(symbol, **deps)
+
+                # Reading the cache times hits the cache backend
+                validators = await run_in_threadpool(
+                    get_validators, resource, symbol, deps
+                )
+                if (
+                    validators is not None
+                    and validators.fresh
+                    and validators.matches(*conditions)
+                ):
+                    return Response(status_code=304, headers=validators.headers())
+
+            body = await handler(request)
+            if isinstance(body, Response):
+                return body
+
+            if deps is not None:
+                validators = await run_in_threadpool(
+                    get_validators, resource, symbol, deps
+                )
+
+            if validators is None:
+                return JSONResponse(body)
+
+            if validators.fresh and validators.matches(*conditions):
+                return Response(status_code=304, headers=validators.headers())
+
+            return JSONResponse(body, headers=validators.headers())
+        except Exception as err:
+            return JSONResponse({"status": "ERROR", "error": str(err)}, 500)
+
+    return wrapper
+
+
+async def warm_ratios(symbol: str, fields: List[str] | None) -> None:
+    fields = list(RATIOS.keys()) if fields is None else fields
+
+    warm = [yahoo_finance.warm_modules(symbol, ratio_modules(fields))]
+    if any(f in DIVIDEND_RATIOS for f in fields):
+        warm.append(yahoo_finance.warm_dividends(symbol))
+
+    await asyncio.gather(*warm)
+
+
+async def get_ratios(request: Request) -> Dict[str, Any]:
+    symbol = request.path_params["symbol"]
+    await warm_ratios(symbol, None)
+
+    return {"status": "OK", "data": await run_in_threadpool(compute_ratios, symbol)}
+
+
+async def get_batch_ratios(request: Request) -> Dict[str, Any] | Response:
+    try:
+        body = await request.json() if request.method == "POST" else {}
+    except ValueError:
+        body = {}
+
+    symbols, fields = parse_batch_args(body or {}, request.query_params)
+
+    deps = batch_dependencies(fields)
+    for symbol in symbols:
+        cache_warmer.record(symbol, **deps)
+
+    async def compute(symbol: str) -> Dict[str, Any]:
+        await warm_ratios(symbol, fields)
+        return await run_in_threadpool(compute_ratios, symbol, fields)
+
+    # Same window as the Flask app, so a large batch is not fetched all at once
+    def completed() -> AsyncGenerator[tuple, None]:
+        return aiter_completed(compute, symbols, window=BATCH_WORKERS * 2)
+
+    fmt = request.query_params.get("stream")
+    if fmt is None and request.headers.get("accept") == STREAM_FORMATS["ndjson"]:
+        fmt = "ndjson"
+
+    assert fmt is None or fmt in STREAM_FORMATS, f"Unknown stream format {fmt}."
+
+    if fmt is not None:
+
+        async def rows() -> AsyncGenerator[str, None]:
+            if fmt == "json":
+                yield "["
+
+            separator = ""
+            async for symbol, data, err in completed():
+                if err is None:
+                    row = {"symbol": symbol, "status": "OK", "data": data}
+                else:
+                    row = {"symbol": symbol, "status": "ERROR", "error": str(err)}
+
+                if fmt == "ndjson":
+                    yield json.dumps(row) + "\n"
+                else:
+                    yield separator + json.dumps(row)
+                    separator = ","
+
+            if fmt == "json":
+                yield "]"
+
+        return StreamingResponse(rows(), media_type=STREAM_FORMATS[fmt])
+
+    data, errors = {}, {}
+    async for symbol, res, err in completed():
+        if err is None:
+            data[symbol] = res
+        else:
+            errors[symbol] = str(err)
+
+    return {"status": "OK", "data": data, "errors": errors}
+
+
+async def get_company(request: Request) -> Dict[str, Any]:
+    symbol = request.path_params["symbol"]
+    await yahoo_finance.warm_modules(symbol, ["quoteType", "assetProfile"])
+
+    return await run_in_threadpool(company_body, symbol)
+
+
+async def get_dividends(request: Request) -> Dict[str, Any]:
+    symbol = request.path_params["symbol"]
+    await yahoo_finance.warm_dividends(symbol)
+
+    return await run_in_threadpool(dividends_body, symbol)
+
+
+async def get_indicators(request: Request) -> Dict[str, Any]:
+    symbol = request.path_params["symbol"]
+    interval, limit = parse_indicators_args(request.query_params)
+    await yahoo_finance.warm_prices(symbol, interval)
+
+    return await run_in_threadpool(indicators_body, symbol, interval, limit)
+
+
+async def run_screen(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        body = None
+
+    return await run_in_threadpool(screen_body, body)
+
+
+def statements_endpoint(schema, body: Callable[[str, str, str], Dict[str, Any]]):
+    async def handler(request: Request) -> Dict[str, Any]:
+        symbol = request.path_params["symbol"]
+        period, fmt = parse_statements_args(request.query_params)
+
+        # Unknown periods are reported by the body builder
+        if period in PERIODS:
+            await yahoo_finance.warm_modules(symbol, [schema.modules[period]])
+
+        return await run_in_threadpool(body, symbol, period, fmt)
+
+    return handler
+
+
+routes = [
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/ratios",
+        endpoint(get_ratios, ratios_dependencies),
+    ),
+    Route(
+        f"{API_V1}/tickers/ratios",
+        endpoint(get_batch_ratios),
+        methods=["GET", "POST"],
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/company",
+        endpoint(get_company, company_dependencies),
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/dividends",
+        endpoint(get_dividends, dividends_dependencies),
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/indicators",
+        endpoint(get_indicators, indicators_dependencies),
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/income-statements",
+        endpoint(
+            statements_endpoint(INCOME_STATEMENT, income_statements_body),
+            statements_dependencies(INCOME_STATEMENT),
+        ),
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/balance-sheets",
+        endpoint(
+            statements_endpoint(BALANCE_SHEET, balance_sheets_body),
+            statements_dependencies(BALANCE_SHEET),
+        ),
+    ),
+    Route(
+        f"{API_V1}/ticker/{{symbol}}/cash-flows",
+        endpoint(
+            statements_endpoint(CASH_FLOW, cash_flows_body),
+            statements_dependencies(CASH_FLOW),
+        ),
+    ),
+    Route(f"{API_V1}/screens", endpoint(run_screen), methods=["POST"]),
+]
+
+
+async def start_warmer() -> None:
+    if WARMER_ENABLED:
+        cache_warmer.start()
+
+
+async def stop_warmer() -> None:
+    await run_in_threadpool(cache_warmer.stop)
+
+
+app = Starlette(
+    routes=routes,
+    on_startup=[start_warmer],
+    on_shutdown=[stop_warmer, yahoo_finance.aclose],
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8085)
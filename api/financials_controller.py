@@ -1,22 +1,56 @@
-from flask import jsonify
+from typing import Any, Dict, Tuple
+from flask import jsonify, request
 
 from src.financial import Financial
+from src.statements import PERIODS, StatementSchema
+
+
+def parse_statements_args(args: dict) -> Tuple[str, str]:
+    return args.get("period", "annual"), args.get("format", "rows")
+
+
+def statements_dependencies(schema: StatementSchema):
+    def dependencies(symbol: str, args: dict) -> Dict[str, Any]:
+        period, _ = parse_statements_args(args)
+        assert period in PERIODS, f"Period must be one of {', '.join(PERIODS)}."
+
+        return {"modules": [schema.modules[period]]}
+
+    return dependencies
+
+
+def income_statements_body(symbol: str, period: str, fmt: str) -> Dict[str, Any]:
+    f = Financial(symbol)
+    return {
+        "status": "OK",
+        "data": f.get_income_statements(period, fmt),
+        "title": f.get_income_statements_titles(),
+    }
+
+
+def balance_sheets_body(symbol: str, period: str, fmt: str) -> Dict[str, Any]:
+    f = Financial(symbol)
+    return {
+        "status": "OK",
+        "data": f.get_balance_sheets(period, fmt),
+        # "title": f.get_income_statements_titles(),
+    }
+
+
+def cash_flows_body(symbol: str, period: str, fmt: str) -> Dict[str, Any]:
+    f = Financial(symbol)
+    return {
+        "status": "OK",
+        "data": f.get_cash_flows(period, fmt),
+        # "title": f.get_income_statements_titles(),
+    }
 
 
 def get_income_statements(symbol: str):
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        f = Financial(symbol)
-        return (
-            jsonify(
-                {
-                    "status": "OK",
-                    "data": f.get_income_statements(),
-                    "title": f.get_income_statements_titles(),
-                }
-            ),
-            200,
-        )
+        period, fmt = parse_statements_args(request.args)
+        return jsonify(income_statements_body(symbol, period, fmt)), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
 
@@ -24,17 +58,8 @@ def get_income_statements(symbol: str):
 def get_balance_sheets(symbol: str):
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        f = Financial(symbol)
-        return (
-            jsonify(
-                {
-                    "status": "OK",
-                    "data": f.get_balance_sheets(),
-                    # "title": f.get_income_statements_titles(),
-                }
-            ),
-            200,
-        )
+        period, fmt = parse_statements_args(request.args)
+        return jsonify(balance_sheets_body(symbol, period, fmt)), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
 
@@ -42,16 +67,7 @@ def get_balance_sheets(symbol: str):
 def get_cash_flows(symbol: str):
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        f = Financial(symbol)
-        return (
-            jsonify(
-                {
-                    "status": "OK",
-                    "data": f.get_cash_flows(),
-                    # "title": f.get_income_statements_titles(),
-                }
-            ),
-            200,
-        )
+        period, fmt = parse_statements_args(request.args)
+        return jsonify(cash_flows_body(symbol, period, fmt)), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, List
+from email.utils import formatdate, parsedate_to_datetime
+from functools import wraps
+import hashlib
+import time
+from flask import make_response, request
+
+from src.warmer import cache_warmer
+from src.yahoo_finance import cache_times, CACHE_TTL_SEC
+
+
+class Validators:
+    """
+    HTTP validators of a response built from cache entries fetched at `times`.
+    The ETag changes whenever one of the entries is fetched again.
+    """
+
+    def __init__(self, resource: str, times: List[int]) -> None:
+        versions = ",".join(str(t) for t in times)
+        digest = hashlib.sha1(f"{resource}|{versions}".encode("utf-8")).hexdigest()
+
+        self.etag = f'W/"{digest[:20]}"'
+        self.last_modified = max(times)
+        self.expires_at = min(times) + CACHE_TTL_SEC
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def headers(self) -> Dict[str, str]:
+        max_age = max(0, int(self.expires_at - time.time()))
+
+        return {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}",
+        }
+
+    def matches(self, if_none_match: str | None, if_modified_since: str | None):
+        # If-Modified-Since is ignored when If-None-Match is sent
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or any(
+                t.removeprefix("W/") == self.etag.removeprefix("W/") for t in tags
+            )
+
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+
+            return self.last_modified <= since
+
+        return False
+
+
+def resource_name(path: str, query: str) -> str:
+    return f"{path}?{query}" if query else path
+
+
+def get_validators(resource: str, symbol: str, deps: Dict[str, Any]):
+    times = cache_times(symbol, **deps)
+    return None if times is None else Validators(resource, times)
+
+
+def conditional(dependencies: Callable[[str, dict], Dict[str, Any]]):
+    """
+    Adds ETag, Last-Modified and Cache-Control to a ticker route and answers
+    conditional requests with 304. `dependencies` maps the symbol and query
+    arguments to the cache_times arguments of the data the route reads, which
+    are also recorded for the cache warmer.
+    """
+
+    def decorator(view: Callable):
+        @wraps(view)
+        def wrapper(symbol: str):
+            try:
+                deps = dependencies(symbol, request.args)
+            except Exception:
+                # Invalid arguments are reported by the view
+                return view(symbol)
+
+            cache_warmer.record(symbol, **deps)
+
+            resource = resource_name(request.path, request.query_string.decode("utf-8"))
+            if_none_match = request.headers.get("If-None-Match")
+            if_modified_since = request.headers.get("If-Modified-Since")
+
+            # Fresh entries answer without building the body, stale ones go
+            # through the view so they are refreshed
+            validators = get_validators(resource, symbol, deps)
+            if (
+                validators is not None
+                and validators.fresh
+                and validators.matches(if_none_match, if_modified_since)
+            ):
+                return "", 304, validators.headers()
+
+            res = make_response(view(symbol))
+            if res.status_code != 200:
+                return res
+
+            validators = get_validators(resource, symbol, deps)
+            if validators is None:
+                return res
+
+            # A stale entry is served in full, even when its refresh is pending
+            if validators.fresh and validators.matches(
+                if_none_match, if_modified_since
+            ):
+                return "", 304, validators.headers()
+
+            res.headers.update(validators.headers())
+
+            return res
+
+        return wrapper
+
+    return decorator
@@ -1,56 +1,209 @@
-from flask import jsonify
+from typing import Any, Callable, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import os
+from flask import jsonify, request
 
+from api.streaming import iter_completed, stream_format, stream_response
 from src.ticker import Ticker
+from src.warmer import cache_warmer
+from src.utils import to_date
+
+
+# Ratio name -> (quoteSummary modules it reads, accessor)
+RATIOS: Dict[str, Tuple[Tuple[str, ...], Callable[[Ticker], Any]]] = {
+    "dividend_yield": (("summaryDetail",), lambda t: t.get_dividend_yield()),
+    "current_price": (("price",), lambda t: t.get_current_price()),
+    "current_dividend_amount": ((), lambda t: t.current_year_div_per_share()),
+    "dividend_growth": ((), lambda t: t.get_yearly_dividend_growth(5)),
+    "dividend_ratios_per_year": (
+        ("cashflowStatementHistory",),
+        lambda t: t.get_yearly_ratios(),
+    ),
+    "cadi": ((), lambda t: t.get_cadi()),
+    "beta": (("defaultKeyStatistics",), lambda t: t.get_beta()),
+    "pe_ratio": (("summaryDetail",), lambda t: t.get_pe_ratio()),
+    "eps_ratio": (("defaultKeyStatistics",), lambda t: t.get_eps_ratio()),
+    "peg_ratio": (("defaultKeyStatistics",), lambda t: t.get_peg_ratio()),
+    "market_cap": (("summaryDetail",), lambda t: t.get_market_cap()),
+    "debt_to_equity": (("financialData",), lambda t: t.get_debt_to_equity()),
+    "intrinsec_value": (
+        ("defaultKeyStatistics", "summaryDetail"),
+        lambda t: t.ratios_valuation_model(),
+    ),
+}
+
+# Ratios computed from the dividend history rather than quoteSummary modules
+DIVIDEND_RATIOS = ["current_dividend_amount", "dividend_growth", "cadi"]
+
+PRICE_INTERVALS = ["1d", "5d", "1wk", "1mo", "3mo"]
+
+MAX_BATCH_SYMBOLS = int(os.environ.get("MAX_BATCH_SYMBOLS", 500))
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 16))
+
+batch_executor = ThreadPoolExecutor(
+    max_workers=BATCH_WORKERS, thread_name_prefix="batch"
+)
+
+
+def compute_ratios(symbol: str, fields: List[str] = None) -> Dict[str, Any]:
+    fields = list(RATIOS.keys()) if fields is None else fields
+
+    t = Ticker(symbol)
+    t.load_modules(*ratio_modules(fields))
+
+    return {f: RATIOS[f][1](t) for f in fields}
 
 
 def get_ratios(symbol: str):
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        t = Ticker(symbol)
-        return (
-            jsonify(
-                {
-                    "status": "OK",
-                    "data": {
-                        "dividend_yield": t.get_dividend_yield(),
-                        "current_price": t.get_current_price(),
-                        "current_dividend_amount": t.current_year_div_per_share(),
-                        "dividend_growth": t.get_yearly_dividend_growth(5),
-                        "dividend_ratios_per_year": t.get_yearly_ratios(),
-                        "cadi": t.get_cadi(),
-                        "beta": t.get_beta(),
-                        "pe_ratio": t.get_pe_ratio(),
-                        "eps_ratio": t.get_eps_ratio(),
-                        "peg_ratio": t.get_peg_ratio(),
-                        "market_cap": t.get_market_cap(),
-                        "debt_to_equity": t.get_debt_to_equity(),
-                        "intrinsec_value": t.ratios_valuation_model(),
-                    },
-                }
-            ),
-            200,
-        )
+        return jsonify({"status": "OK", "data": compute_ratios(symbol)}), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
 
 
+def parse_list(value: str | list | None) -> List[str] | None:
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = value.split(",")
+
+    return [v.strip() for v in value if v.strip() != ""]
+
+
+def parse_batch_args(body: dict, args: dict) -> Tuple[List[str], List[str] | None]:
+    symbols = parse_list(body.get("symbols", args.get("symbols")))
+    fields = parse_list(body.get("fields", args.get("fields")))
+
+    assert symbols, "At least one symbol is required."
+    assert (
+        len(symbols) <= MAX_BATCH_SYMBOLS
+    ), f"At most {MAX_BATCH_SYMBOLS} symbols are allowed."
+
+    unknown = [f for f in fields or [] if f not in RATIOS]
+    assert len(unknown) == 0, f"Unknown fields {', '.join(unknown)}."
+
+    return list(dict.fromkeys(symbols)), fields
+
+
+def ratio_modules(fields: List[str] | None) -> List[str]:
+    fields = list(RATIOS.keys()) if fields is None else fields
+    return sorted({m for f in fields for m in RATIOS[f][0]})
+
+
+def get_batch_ratios():
+    try:
+        body = request.get_json(silent=True) or {}
+        symbols, fields = parse_batch_args(body, request.args)
+
+        deps = batch_dependencies(fields)
+        for symbol in symbols:
+            cache_warmer.record(symbol, **deps)
+
+        fmt = stream_format()
+        if fmt is not None:
+            # One row per symbol, flushed as soon as it has been computed
+            def rows():
+                for symbol, data, err in iter_completed(
+                    batch_executor,
+                    lambda s: compute_ratios(s, fields),
+                    symbols,
+                    window=BATCH_WORKERS * 2,
+                ):
+                    if err is None:
+                        yield {"symbol": symbol, "status": "OK", "data": data}
+                    else:
+                        yield {"symbol": symbol, "status": "ERROR", "error": str(err)}
+
+            return stream_response(rows(), fmt)
+
+        futures = {
+            symbol: batch_executor.submit(compute_ratios, symbol, fields)
+            for symbol in symbols
+        }
+
+        data, errors = {}, {}
+        for symbol, future in futures.items():
+            try:
+                data[symbol] = future.result()
+            except Exception as err:
+                errors[symbol] = str(err)
+
+        return jsonify({"status": "OK", "data": data, "errors": errors}), 200
+    except Exception as err:
+        return jsonify({"status": "ERROR", "error": str(err)}), 500
+
+
+def company_body(symbol: str) -> Dict[str, Any]:
+    t = Ticker(symbol)
+    t.load_modules("quoteType", "assetProfile")
+
+    return {
+        "status": "OK",
+        "data": {
+            "company_name": t.get_company_name(),
+            "industry": t.get_industry(),
+            "sector": t.get_sector(),
+        },
+    }
+
+
+def dividends_body(symbol: str) -> Dict[str, Any]:
+    t = Ticker(symbol)
+    return {"status": "OK", "data": t.get_dividends_per_year()}
+
+
+def parse_indicators_args(args: dict) -> Tuple[str, int]:
+    interval = args.get("interval", "1d")
+    assert interval in PRICE_INTERVALS, f"Interval must be one of {PRICE_INTERVALS}."
+
+    limit = int(args.get("limit", 1))
+    assert limit > 0, "Limit must be a positive number."
+
+    return interval, limit
+
+
+def indicators_body(symbol: str, interval: str, limit: int) -> Dict[str, Any]:
+    t = Ticker(symbol)
+    rows = t.get_indicators(interval).rows(limit)
+
+    return {
+        "status": "OK",
+        "data": [{"date": to_date(int(row["timestamp"])), **row} for row in rows],
+    }
+
+
+def ratios_dependencies(symbol: str, args: dict) -> Dict[str, Any]:
+    return {"modules": ratio_modules(None), "dividends": True}
+
+
+def batch_dependencies(fields: List[str] | None) -> Dict[str, Any]:
+    fields = list(RATIOS.keys()) if fields is None else fields
+    return {
+        "modules": ratio_modules(fields),
+        "dividends": any(f in DIVIDEND_RATIOS for f in fields),
+    }
+
+
+def company_dependencies(symbol: str, args: dict) -> Dict[str, Any]:
+    return {"modules": ["quoteType", "assetProfile"]}
+
+
+def dividends_dependencies(symbol: str, args: dict) -> Dict[str, Any]:
+    return {"dividends": True}
+
+
+def indicators_dependencies(symbol: str, args: dict) -> Dict[str, Any]:
+    interval, _ = parse_indicators_args(args)
+    return {"interval": interval}
+
+
 def get_company(symbol: str) -> None:
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        t = Ticker(symbol)
-        return (
-            jsonify(
-                {
-                    "status": "OK",
-                    "data": {
-                        "company_name": t.get_company_name(),
-                        "industry": t.get_industry(),
-                        "sector": t.get_sector(),
-                    },
-                }
-            ),
-            200,
-        )
+        return jsonify(company_body(symbol)), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
 
@@ -58,7 +211,15 @@ def get_company(symbol: str) -> None:
 def get_dividends(symbol: str):
     try:
         assert isinstance(symbol, str), "Symbol must be a type string."
-        t = Ticker(symbol)
-        return jsonify({"status": "OK", "data": t.get_dividends_per_year()}), 200
+        return jsonify(dividends_body(symbol)), 200
+    except Exception as err:
+        return jsonify({"status": "ERROR", "error": str(err)}), 500
+
+
+def get_indicators(symbol: str):
+    try:
+        assert isinstance(symbol, str), "Symbol must be a type string."
+        interval, limit = parse_indicators_args(request.args)
+        return jsonify(indicators_body(symbol, interval, limit)), 200
     except Exception as err:
         return jsonify({"status": "ERROR", "error": str(err)}), 500
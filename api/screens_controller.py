@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Tuple
+from threading import Lock
+import os
+from flask import jsonify, request
+from pandas import DataFrame
+
+from src.ratio_frame import RATIO_PATHS
+from src.screen_index import ScreenIndex, DEFAULT_PATHS
+from src.universe import get_universe
+
+
+MAX_SCREEN_ROWS = int(os.environ.get("MAX_SCREEN_ROWS", 1000))
+
+# Paths clients may screen on. A new path re-extracts every cached entry, so
+# they are indexed once up front instead of on request
+SCREEN_PATHS = list(dict.fromkeys(DEFAULT_PATHS + list(RATIO_PATHS.values())))
+
+# The index is refreshed in place by every screen, so screens run one at a time
+screen_lock = Lock()
+screen_index: ScreenIndex | None = None
+
+
+def get_screen_index() -> ScreenIndex:
+    global screen_index
+    if screen_index is None:
+        screen_index = ScreenIndex(paths=SCREEN_PATHS)
+
+    return screen_index
+
+
+def parse_screen_args(body: dict) -> Tuple[List, Any, Any, int, List[str] | None]:
+    assert isinstance(body, dict), "Screen must be a JSON object."
+
+    query = body.get("query")
+    assert isinstance(query, list), "Query must be a list of predicates."
+
+    limit = body.get("limit", MAX_SCREEN_ROWS)
+    assert (
+        isinstance(limit, int) and 0 <= limit <= MAX_SCREEN_ROWS
+    ), f"Limit must be between 0 and {MAX_SCREEN_ROWS}."
+
+    # Restricts the screen to the constituents of the union of indices
+    indices = body.get("indices")
+    symbols = None if indices is None else get_universe().symbols(indices)
+
+    return query, body.get("fields"), body.get("sort"), limit, symbols
+
+
+def records(table: DataFrame) -> List[Dict[str, Any]]:
+    # NaN is not valid JSON
+    return table.astype(object).where(table.notna(), None).to_dict("records")
+
+
+def screen_body(body: dict) -> Dict[str, Any]:
+    query, fields, sort, limit, symbols = parse_screen_args(body)
+
+    with screen_lock:
+        table = get_screen_index().query(
+            query, fields, sort, limit, symbols, extend=False
+        )
+
+    return {"status": "OK", "data": records(table)}
+
+
+def run_screen():
+    try:
+        return jsonify(screen_body(request.get_json(silent=True))), 200
+    except Exception as err:
+        return jsonify({"status": "ERROR", "error": str(err)}), 500
@@ -0,0 +1,99 @@
+from typing import Any, AsyncGenerator, Awaitable, Callable, Generator, Iterable, Tuple
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+import asyncio
+import json
+from flask import Response, request
+
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def stream_format() -> str | None:
+    fmt = request.args.get("stream")
+    if fmt is None and request.accept_mimetypes.best == STREAM_FORMATS["ndjson"]:
+        fmt = "ndjson"
+
+    assert fmt is None or fmt in STREAM_FORMATS, f"Unknown stream format {fmt}."
+
+    return fmt
+
+
+def iter_completed(
+    executor: Executor, func: Callable, items: Iterable, window: int
+) -> Generator[Tuple[Any, Any, Exception | None], None, None]:
+    """
+    Yields (item, result, error) in completion order, keeping at most `window`
+    calls in flight so results are never all held in memory at once.
+    """
+    items = iter(items)
+    pending = {}
+
+    for item in items:
+        pending[executor.submit(func, item)] = item
+        if len(pending) >= window:
+            break
+
+    while len(pending) > 0:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            item = pending.pop(future)
+            try:
+                yield item, future.result(), None
+            except Exception as err:
+                yield item, None, err
+
+            for next_item in items:
+                pending[executor.submit(func, next_item)] = next_item
+                break
+
+
+async def aiter_completed(
+    func: Callable[[Any], Awaitable], items: Iterable, window: int
+) -> AsyncGenerator[Tuple[Any, Any, Exception | None], None]:
+    """
+    Same as iter_completed, for a coroutine function on the event loop. Tasks
+    still in flight are cancelled when the consumer stops early.
+    """
+    items = iter(items)
+    pending = {}
+
+    for item in items:
+        pending[asyncio.ensure_future(func(item))] = item
+        if len(pending) >= window:
+            break
+
+    try:
+        while len(pending) > 0:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                try:
+                    yield item, task.result(), None
+                except Exception as err:
+                    yield item, None, err
+
+                for next_item in items:
+                    pending[asyncio.ensure_future(func(next_item))] = next_item
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def stream_response(rows: Iterable[dict], fmt: str) -> Response:
+    def ndjson():
+        for row in rows:
+            yield json.dumps(row) + "\n"
+
+    def json_array():
+        yield "["
+        for i, row in enumerate(rows):
+            yield ("," if i > 0 else "") + json.dumps(row)
+        yield "]"
+
+    body = ndjson() if fmt == "ndjson" else json_array()
+
+    return Response(body, status=200, mimetype=STREAM_FORMATS[fmt])
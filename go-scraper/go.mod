@@ -1,3 +0,0 @@
-module github.com/MihaiBlebea/investment_api/go-scraper
-
-go 1.16
@@ -1,8 +1,6 @@
 from pprint import pprint
 from src.screener import Screener
-from src.ticker import Ticker
-
-from pandas import DataFrame
+from src.ratio_frame import RatioFrame, RATIO_PATHS
 
 
 def main():
@@ -10,35 +8,37 @@ def main():
     # screener.get_snp_500()
     screener.scrape()
 
-    res = screener.query(
-        [
-            # ("defaultKeyStatistics.trailingPE.raw", "lt", 15),
-            # ("defaultKeyStatistics.pegRatio.raw", "gt", 10),
-            # ("summaryDetail.dividendYield.raw", "gt", 0.05),
-            ("assetProfile.sector", "eq", "Financial Services"),
-            ("assetProfile.industry", "in", ["Banks—Regional", "Banks—Diversified"]),
-        ]
+    queries = [
+        # ("defaultKeyStatistics.trailingPE.raw", "lt", 15),
+        # ("defaultKeyStatistics.pegRatio.raw", "gt", 10),
+        # ("summaryDetail.dividendYield.raw", "gt", 0.05),
+        ("assetProfile.sector", "eq", "Financial Services"),
+        ("assetProfile.industry", "in", ["Banks—Regional", "Banks—Diversified"]),
+    ]
+    fields = {
+        "PE": "summaryDetail.trailingPE.raw",
+        "PEG": "defaultKeyStatistics.pegRatio.raw",
+        "DivYield": "summaryDetail.dividendYield.raw",
+        "ProfitMargins": "defaultKeyStatistics.profitMargins.raw",
+    }
+
+    # A new path re-extracts the whole index, so every path read below is
+    # added before the first screen
+    screener.index.add_paths(
+        [q[0] for q in queries] + list(fields.values()) + list(RATIO_PATHS.values())
     )
 
-    data = []
-    for s in res:
-        t = Ticker(s)
-
-        data.append(
-            [
-                s,
-                round(t.get_pe_ratio(), 2),
-                t.get_peg_ratio(),
-                t.get_dividend_yield(),
-                t.get_profit_margin(),
-            ]
-        )
-
-    df = DataFrame(
-        data=data, columns=["symbol", "PE", "PEG", "DivYield", "ProfitMargins"]
+    df = screener.query(queries, fields=fields, sort="-ProfitMargins")
+    df["PE"] = df["PE"].round(2)
+
+    # Derived metrics are column expressions over the same index
+    ratios = RatioFrame(screener.index).build(
+        symbols=df["symbol"].tolist(), with_dividends=False
     )
+    ratios = ratios[["symbol", "debt_to_equity", "ratios_valuation_model"]]
+    ratios.columns = ["symbol", "DebtToEquity", "ValuationModel"]
 
-    df = df.sort_values("ProfitMargins", ignore_index=True, ascending=False)
+    df = df.merge(ratios, on="symbol", how="left")
 
     print(df)
 
@@ -0,0 +1,133 @@
+from typing import Any, Awaitable, Callable, Dict, List
+from urllib.parse import urlparse
+import asyncio
+import os
+import httpx
+
+from src.fetcher import get_rate_limiter
+from src.yahoo_finance import (
+    missing_modules,
+    read_ticker_entry,
+    write_ticker_modules,
+    YahooFinance,
+    CACHE_TTL_SEC,
+    TIMEOUT,
+    USER_AGENT,
+)
+
+
+ASYNC_POOL_SIZE = int(os.environ.get("YAHOO_ASYNC_POOL_SIZE", 256))
+
+
+def create_async_client(pool_size: int = ASYNC_POOL_SIZE) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        headers={"user-agent": USER_AGENT, "accept-encoding": "gzip, deflate"},
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=httpx.Timeout(TIMEOUT[1], connect=TIMEOUT[0]),
+    )
+
+
+class AsyncYahooFinance(YahooFinance):
+    """
+    Fills the same caches as YahooFinance without blocking the event loop.
+    Handlers warm the entries they need, after which the synchronous
+    YahooFinance reads them without upstream requests.
+    """
+
+    def __init__(self, client: httpx.AsyncClient = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.client = create_async_client() if client is None else client
+        self.inflight: Dict[str, asyncio.Future] = {}
+
+    async def _aget(self, url: str) -> httpx.Response:
+        if self.rate_limit is not None:
+            limiter = get_rate_limiter(urlparse(url).netloc, self.rate_limit)
+            await asyncio.sleep(limiter.reserve())
+
+        return await self.client.get(url)
+
+    async def _once(self, key: str, func: Callable[[], Awaitable]) -> Any:
+        # Same as single_flight, for coroutines on the event loop
+        future = self.inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(func())
+        self.inflight[key] = future
+        try:
+            return await future
+        finally:
+            del self.inflight[key]
+
+    async def warm_modules(self, symbol: str, modules: List[str]) -> None:
+        max_age_sec = (
+            self.stores.tickers.max_age_sec if self.serve_stale else CACHE_TTL_SEC
+        )
+
+        # Cache reads and writes hit the backend, so they run in worker threads
+        def missing() -> List[str]:
+            entry = read_ticker_entry(symbol, self.stores)
+            return missing_modules(entry, modules, max_age_sec)
+
+        async def fetch() -> None:
+            fetched = await asyncio.to_thread(missing)
+            if len(fetched) == 0:
+                return
+
+            print(f"Fetching {', '.join(fetched)} for {symbol} from source")
+            res = await self._aget(self._modules_url(symbol, fetched))
+            result = self._parse_modules(res)
+
+            def write() -> None:
+                # Read again, another worker may have written other modules meanwhile
+                entry = read_ticker_entry(symbol, self.stores)
+                write_ticker_modules(symbol, entry, result, fetched, self.stores)
+
+            await asyncio.to_thread(write)
+
+        while len(await asyncio.to_thread(missing)) > 0:
+            await self._once(self.stores.tickers.key(f"ticker_{symbol}"), fetch)
+
+    async def _warm_history(
+        self, store, name: str, url: Callable[[int | None], str], parse: Callable
+    ) -> None:
+        async def fetch() -> None:
+            entry = await asyncio.to_thread(store.read, name)
+            if not store.blocking(entry, self.serve_stale):
+                return
+
+            bars = store.empty() if entry is None else entry["bars"]
+            since = store.since(bars)
+
+            print(f"Fetching {store.cache_key(name)} from source since {since}")
+            res = await self._aget(url(since))
+
+            def write() -> None:
+                store.write(name, store.merge(bars, parse(res), since))
+
+            await asyncio.to_thread(write)
+
+        entry = await asyncio.to_thread(store.read, name)
+        if store.blocking(entry, self.serve_stale):
+            await self._once(store.cache_key(name), fetch)
+
+    async def warm_dividends(self, symbol: str) -> None:
+        await self._warm_history(
+            self.stores.dividends,
+            f"dividends_{symbol}",
+            lambda since: self._dividends_url(symbol, since),
+            self._parse_dividends,
+        )
+
+    async def warm_prices(self, symbol: str, interval: str = "1mo") -> None:
+        await self._warm_history(
+            self.stores.prices,
+            f"prices_{symbol}_{interval}",
+            lambda since: self._prices_url(symbol, interval, since),
+            self._parse_prices,
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -0,0 +1,479 @@
+from typing import Any, Callable, Dict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+import zlib
+
+from src.cache_backends import atomic_write, get_backend, FileBackend
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+
+MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded in-memory cache evicting the least recently used entries once the
+    total size of the stored entries goes over `max_bytes`. The size of an
+    entry is given by the caller, see object_size.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.entries: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if time.time() >= expires_at:
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return value
+
+    def set(self, key: str, value: Any, size: int, expires_at: float) -> None:
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+            # Entries larger than the whole cache would only evict everything else
+            if size > self.max_bytes:
+                return
+
+            self.entries[key] = (value, size, expires_at)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "size": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+
+def object_size(value: Any) -> int:
+    """
+    Estimated heap size of a decoded entry: the sizes of every dict, list and
+    scalar it holds. Compressed entries decode to many times their length.
+    """
+    size = 0
+    seen = set()
+    stack = [value]
+    while len(stack) > 0:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set)):
+            stack.extend(item)
+
+    return size
+
+
+memory_cache = LRUCache(
+    int(os.environ.get("CACHE_MEMORY_MAX_BYTES", 256 * 1024 * 1024))
+)
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers arriving while a call for
+    the same key is in flight wait for it and share its result or error.
+    """
+
+    def __init__(self) -> None:
+        self.calls: Dict[str, _Call] = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+            call.event.set()
+
+
+single_flight = SingleFlight()
+
+
+class Refresher:
+    """
+    Runs cache refreshes in the background, at most one pending per key.
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="cache-refresh"
+        )
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def schedule(self, key: str, func: Callable[[], Any]) -> bool:
+        with self.lock:
+            if key in self.pending:
+                return False
+
+            self.pending.add(key)
+
+        self.executor.submit(self._run, key, func)
+
+        return True
+
+    def _run(self, key: str, func: Callable[[], Any]) -> None:
+        try:
+            func()
+        except Exception as err:
+            print(f"Background refresh of {key} failed: {err}")
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+
+refresher = Refresher(int(os.environ.get("CACHE_REFRESH_WORKERS", 4)))
+
+
+class JsonSerializer:
+    extension = ".json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, indent=4, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+CACHE_MAGIC = b"IAPC"
+
+CACHE_FORMAT_VERSION = 1
+
+# Same layout, followed by an HMAC-SHA256 of the payload
+CACHE_SIGNED_FORMAT_VERSION = 2
+
+# Key signing the entries of shared backends, which are only unpickled when
+# signed with it
+CACHE_SECRET = os.environ.get("CACHE_SECRET")
+
+# Codec ids are written in the header, never reuse or renumber them
+CODECS = {
+    "none": 0,
+    "zlib": 1,
+    "zstd": 2,
+    "lz4": 3,
+}
+
+
+class BinarySerializer:
+    """
+    Pickle (protocol 5) payload behind a 6 byte header: magic, format version
+    and the id of the codec used to compress the payload. With a `secret` the
+    header is followed by an HMAC of the payload, checked before unpickling.
+    """
+
+    extension = ".bin"
+
+    def __init__(self, compression: str = "none", secret: bytes = None) -> None:
+        assert compression in CODECS, f"Unknown compression {compression}."
+        assert compression != "zstd" or zstandard is not None, "zstandard is missing."
+        assert compression != "lz4" or lz4 is not None, "lz4 is missing."
+
+        self.compression = compression
+        self.secret = secret
+
+    def sign(self, data: bytes) -> bytes:
+        return hmac.new(self.secret, data, hashlib.sha256).digest()
+
+    def dumps(self, value: Any) -> bytes:
+        data = pickle.dumps(value, protocol=5)
+
+        match self.compression:
+            case "zlib":
+                data = zlib.compress(data, 6)
+            case "zstd":
+                data = zstandard.ZstdCompressor(level=3).compress(data)
+            case "lz4":
+                data = lz4.frame.compress(data)
+
+        if self.secret is None:
+            version, signature = CACHE_FORMAT_VERSION, b""
+        else:
+            version, signature = CACHE_SIGNED_FORMAT_VERSION, self.sign(data)
+
+        header = CACHE_MAGIC + bytes([version, CODECS[self.compression]])
+
+        return header + signature + data
+
+    def loads(self, data: bytes) -> Any:
+        assert data[:4] == CACHE_MAGIC, "Not a binary cache entry."
+
+        version, codec = data[4], data[5]
+        if self.secret is None:
+            assert version == CACHE_FORMAT_VERSION, f"Unknown cache format {version}."
+            data = data[6:]
+        else:
+            # Raised rather than asserted, the check must survive python -O
+            if version != CACHE_SIGNED_FORMAT_VERSION:
+                raise ValueError("Unsigned cache entry.")
+
+            signature, data = data[6:38], data[38:]
+            if not hmac.compare_digest(signature, self.sign(data)):
+                raise ValueError("Invalid cache entry signature.")
+
+        match codec:
+            case 1:
+                data = zlib.decompress(data)
+            case 2:
+                data = zstandard.ZstdDecompressor().decompress(data)
+            case 3:
+                data = lz4.frame.decompress(data)
+
+        return pickle.loads(data)
+
+
+def get_serializer(
+    name: str, compression: str = None
+) -> JsonSerializer | BinarySerializer:
+    if name == "json":
+        return JsonSerializer()
+
+    if compression is None:
+        compression = "zstd" if zstandard is not None else "none"
+
+    return BinarySerializer(compression)
+
+
+default_serializer = get_serializer(
+    os.environ.get("CACHE_FORMAT", "binary"), os.environ.get("CACHE_COMPRESSION")
+)
+
+
+def serializer_for(backend) -> JsonSerializer | BinarySerializer:
+    """
+    Serializer of the entries in `backend`. Whoever can write to a shared
+    backend could run code in every process unpickling from it, so their
+    entries are signed with CACHE_SECRET.
+    """
+    shared = not isinstance(backend, FileBackend)
+    if not shared or isinstance(default_serializer, JsonSerializer):
+        return default_serializer
+
+    assert CACHE_SECRET, "CACHE_SECRET is required by shared cache backends."
+
+    return BinarySerializer(default_serializer.compression, CACHE_SECRET.encode())
+
+
+def load_cache_data(data: bytes, serializer: BinarySerializer = None) -> Any:
+    if data[:4] == CACHE_MAGIC:
+        return (BinarySerializer() if serializer is None else serializer).loads(data)
+
+    return json.loads(data)
+
+
+def load_cache_file(path: Path) -> Any:
+    with open(path, "rb") as file:
+        return load_cache_data(file.read())
+
+
+def migrate_json_entry(path: Path, serializer: BinarySerializer) -> bool:
+    """
+    Rewrites the legacy `.json` entry next to `path` in the serializer format,
+    keeping its mtime so the entry does not look fresher than it is.
+    """
+    legacy_path = path.with_suffix(JsonSerializer.extension)
+
+    try:
+        mtime = legacy_path.stat().st_mtime
+        with open(legacy_path, "rb") as file:
+            value = json.loads(file.read())
+    except (FileNotFoundError, ValueError):
+        return False
+
+    atomic_write(path, serializer.dumps(value))
+    os.utime(path, (mtime, mtime))
+
+    try:
+        legacy_path.unlink()
+    except FileNotFoundError:
+        pass
+
+    return True
+
+
+class CacheStore:
+    """
+    Named entries in the cache backend, read through the process-wide memory
+    tier. Entries older than `max_age_sec` are treated as missing.
+
+    Other processes sharing the backend may rewrite an entry, so a memory hit
+    is only served while the backend holds the same version of it. Checking
+    its creation time costs a stat or a single lookup, not a payload read.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_age_sec: int,
+        serializer: JsonSerializer | BinarySerializer = None,
+        backend=None,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_age_sec = max_age_sec
+        self.backend = get_backend(cache_dir) if backend is None else backend
+        self.serializer = (
+            serializer_for(self.backend) if serializer is None else serializer
+        )
+
+    def entry(self, name: str) -> str:
+        return f"{name}{self.serializer.extension}"
+
+    def key(self, name: str) -> str:
+        return self.backend.name(self.entry(name))
+
+    def read(self, name: str) -> tuple:
+        key = self.key(name)
+
+        cached = memory_cache.get(key, MISSING)
+        if cached is not MISSING:
+            if self.backend.created_at(self.entry(name)) == cached[1]:
+                return cached
+
+            memory_cache.delete(key)
+
+        stored = self.backend.get(self.entry(name))
+        if stored is None and self.migrate_json(name):
+            stored = self.backend.get(self.entry(name))
+
+        if stored is None:
+            return MISSING
+
+        raw, created_at = stored
+        if time.time() >= created_at + self.max_age_sec:
+            return MISSING
+
+        try:
+            value = self.serializer.loads(raw)
+        except ValueError as err:
+            # Refetched and overwritten like a missing entry
+            print(f"Ignoring cache entry {key}: {err}")
+            return MISSING
+
+        cached = (value, created_at)
+        memory_cache.set(key, cached, object_size(value), created_at + self.max_age_sec)
+
+        return cached
+
+    def migrate_json(self, name: str) -> bool:
+        # Legacy `.json` entries only exist in cache folders
+        if not isinstance(self.backend, FileBackend):
+            return False
+
+        if self.serializer.extension == JsonSerializer.extension:
+            return False
+
+        return migrate_json_entry(self.backend.path(self.entry(name)), self.serializer)
+
+    def write(self, name: str, value: Any) -> int:
+        raw = self.serializer.dumps(value)
+        created_at = self.backend.set(self.entry(name), raw, self.max_age_sec)
+
+        memory_cache.set(
+            self.key(name),
+            (value, created_at),
+            object_size(value),
+            created_at + self.max_age_sec,
+        )
+
+        return created_at
+
+    def delete(self, name: str) -> None:
+        self.backend.delete(self.entry(name))
+        memory_cache.delete(self.key(name))
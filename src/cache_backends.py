@@ -0,0 +1,301 @@
+from typing import Dict, Tuple
+from pathlib import Path
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "file")
+
+# Directory, database file or redis:// URL, depending on the backend
+CACHE_URL = os.environ.get("CACHE_URL")
+
+CACHE_NAMESPACE = os.environ.get("CACHE_NAMESPACE", "")
+
+
+def atomic_write(path: Path, data: str | bytes) -> None:
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as file:
+            file.write(data)
+
+        # Readers see either the previous file or the complete new one
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class FileBackend:
+    """
+    One file per entry, the mtime of the file is the creation time. Entries are
+    not removed on expiry, readers compare the creation time with their TTL.
+    """
+
+    def __init__(self, cache_dir: str, namespace: str = "") -> None:
+        self.root = Path(cache_dir) / namespace if namespace else Path(cache_dir)
+
+    def path(self, key: str) -> Path:
+        return self.root / key
+
+    def name(self, key: str) -> str:
+        return str(self.path(key))
+
+    def get(self, key: str) -> Tuple[bytes, int] | None:
+        path = self.path(key)
+
+        try:
+            created_at = int(path.stat().st_mtime)
+            with open(path, "rb") as file:
+                return file.read(), created_at
+        except FileNotFoundError:
+            return None
+
+    def created_at(self, key: str) -> int | None:
+        try:
+            return int(self.path(key).stat().st_mtime)
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, data: bytes, ttl_sec: int) -> int:
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path(key), data)
+
+        # The mtime is read back as the creation time
+        return int(self.path(key).stat().st_mtime)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def scan(self, prefix: str) -> Dict[str, int]:
+        keys = {}
+        for path in self.root.glob(f"{prefix}*"):
+            try:
+                keys[path.name] = int(path.stat().st_mtime)
+            except FileNotFoundError:
+                continue
+
+        return keys
+
+
+class SQLiteBackend:
+    """
+    Entries in a single SQLite database in WAL mode, so workers on the same host
+    read concurrently while one of them writes.
+    """
+
+    # Expired rows are deleted once every PURGE_EVERY writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str, namespace: str = "") -> None:
+        self.path = path
+        self.prefix = f"{namespace}:" if namespace else ""
+        self.local = threading.local()
+        self.writes = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self.connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "created_at INTEGER NOT NULL, expires_at INTEGER NOT NULL)"
+            )
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+
+        return conn
+
+    def name(self, key: str) -> str:
+        return f"sqlite:{self.path}:{self.prefix}{key}"
+
+    def get(self, key: str) -> Tuple[bytes, int] | None:
+        row = (
+            self.connection()
+            .execute(
+                "SELECT value, created_at FROM cache_entries "
+                "WHERE key = ? AND expires_at > ?",
+                (self.prefix + key, int(time.time())),
+            )
+            .fetchone()
+        )
+
+        return None if row is None else (bytes(row[0]), row[1])
+
+    def created_at(self, key: str) -> int | None:
+        row = (
+            self.connection()
+            .execute(
+                "SELECT created_at FROM cache_entries "
+                "WHERE key = ? AND expires_at > ?",
+                (self.prefix + key, int(time.time())),
+            )
+            .fetchone()
+        )
+
+        return None if row is None else row[0]
+
+    def set(self, key: str, data: bytes, ttl_sec: int) -> int:
+        created_at = int(time.time())
+
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?)",
+                (self.prefix + key, data, created_at, created_at + ttl_sec),
+            )
+
+            self.writes += 1
+            if self.writes % self.PURGE_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE expires_at <= ?", (created_at,)
+                )
+
+        return created_at
+
+    def delete(self, key: str) -> None:
+        with self.connection() as conn:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key = ?", (self.prefix + key,)
+            )
+
+    def scan(self, prefix: str) -> Dict[str, int]:
+        start = self.prefix + prefix
+        rows = self.connection().execute(
+            "SELECT key, created_at FROM cache_entries "
+            "WHERE key >= ? AND key < ? AND expires_at > ?",
+            (start, start + "\U0010ffff", int(time.time())),
+        )
+
+        return {key[len(self.prefix) :]: created_at for key, created_at in rows}
+
+
+class RedisBackend:
+    """
+    Entries as redis hashes holding the payload and its creation time, expired
+    by redis itself. Any client with the redis-py interface can be passed in.
+    """
+
+    def __init__(self, url: str = None, namespace: str = "", client=None) -> None:
+        if client is None:
+            assert redis is not None, "redis is missing."
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+
+        self.client = client
+        self.prefix = f"{namespace}:" if namespace else ""
+
+    def name(self, key: str) -> str:
+        return f"redis:{self.prefix}{key}"
+
+    def get(self, key: str) -> Tuple[bytes, int] | None:
+        value, created_at = self.client.hmget(self.prefix + key, "value", "created_at")
+        if value is None:
+            return None
+
+        return value, int(created_at)
+
+    def created_at(self, key: str) -> int | None:
+        created_at = self.client.hget(self.prefix + key, "created_at")
+        return None if created_at is None else int(created_at)
+
+    def set(self, key: str, data: bytes, ttl_sec: int) -> int:
+        created_at = int(time.time())
+
+        pipe = self.client.pipeline()
+        pipe.hset(self.prefix + key, mapping={"value": data, "created_at": created_at})
+        pipe.expire(self.prefix + key, ttl_sec)
+        pipe.execute()
+
+        return created_at
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def scan(self, prefix: str) -> Dict[str, int]:
+        keys = list(self.client.scan_iter(match=f"{self.prefix}{prefix}*", count=1000))
+
+        pipe = self.client.pipeline()
+        for key in keys:
+            pipe.hget(key, "created_at")
+
+        res = {}
+        for key, created_at in zip(keys, pipe.execute()):
+            # Entries may expire between the scan and the lookup
+            if created_at is not None:
+                key = key.decode("utf-8") if isinstance(key, bytes) else key
+                res[key[len(self.prefix) :]] = int(created_at)
+
+        return res
+
+
+_backends: Dict[tuple, FileBackend | SQLiteBackend | RedisBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def create_backend(
+    cache_dir: str,
+    kind: str = None,
+    url: str = None,
+    namespace: str = None,
+) -> FileBackend | SQLiteBackend | RedisBackend:
+    """
+    New backend configured by CACHE_BACKEND, CACHE_URL and CACHE_NAMESPACE.
+    `cache_dir` is where the file and sqlite backends keep their data when no
+    CACHE_URL is set.
+    """
+    kind = CACHE_BACKEND if kind is None else kind
+    url = CACHE_URL if url is None else url
+    namespace = CACHE_NAMESPACE if namespace is None else namespace
+
+    match kind:
+        case "file":
+            return FileBackend(url or cache_dir, namespace)
+        case "sqlite":
+            return SQLiteBackend(url or f"{cache_dir}/cache.db", namespace)
+        case "redis":
+            return RedisBackend(url, namespace)
+        case _:
+            raise ValueError(f"Unknown cache backend {kind}")
+
+
+def get_backend(
+    cache_dir: str,
+    kind: str = None,
+    url: str = None,
+    namespace: str = None,
+) -> FileBackend | SQLiteBackend | RedisBackend:
+    """
+    Backend shared by the process, see create_backend.
+    """
+    key = (
+        CACHE_BACKEND if kind is None else kind,
+        CACHE_URL if url is None else url,
+        CACHE_NAMESPACE if namespace is None else namespace,
+        cache_dir,
+    )
+
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = create_backend(cache_dir, *key[:3])
+            _backends[key] = backend
+
+        return backend
@@ -0,0 +1,85 @@
+from typing import Dict, List, Tuple
+from datetime import datetime
+import time
+import numpy as np
+
+
+class DividendSeries:
+    """
+    Dividend history held as typed arrays, with the yearly aggregates derived
+    from it computed once and memoized.
+    """
+
+    def __init__(self, dividends: List[dict]) -> None:
+        dates = np.fromiter((d["date"] for d in dividends), np.int64, len(dividends))
+        amounts = np.fromiter(
+            (d["amount"] for d in dividends), np.float64, len(dividends)
+        )
+
+        order = np.argsort(dates, kind="stable")
+        self.dates = dates[order]
+        self.amounts = amounts[order]
+        self.years = self._local_years(self.dates)
+
+        self._per_year: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._growth: Dict[Tuple[int, int], float] = {}
+
+    @staticmethod
+    def _local_years(dates: np.ndarray) -> np.ndarray:
+        if dates.size == 0:
+            return dates
+
+        # Bucket by local-time year boundaries, same as datetime.fromtimestamp
+        first = datetime.fromtimestamp(dates[0]).year
+        last = datetime.fromtimestamp(dates[-1]).year
+        boundaries = np.array(
+            [time.mktime((y, 1, 1, 0, 0, 0, 0, 0, -1)) for y in range(first, last + 2)]
+        )
+
+        return np.searchsorted(boundaries, dates, side="right") - 1 + first
+
+    def per_year(self, exclude_year: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        if exclude_year not in self._per_year:
+            mask = self.years != exclude_year
+            years, index = np.unique(self.years[mask], return_inverse=True)
+            sums = np.bincount(index, weights=self.amounts[mask], minlength=years.size)
+
+            self._per_year[exclude_year] = (years, sums)
+
+        return self._per_year[exclude_year]
+
+    def completed_years(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.per_year(exclude_year=datetime.now().year)
+
+    def yearly(self) -> Dict[int, float]:
+        years, sums = self.completed_years()
+        return dict(zip(years.tolist(), sums.tolist()))
+
+    def growth(self, last_years: int = None) -> float:
+        key = (datetime.now().year, last_years)
+        if key not in self._growth:
+            _, sums = self.completed_years()
+            if last_years is not None:
+                sums = sums[-last_years:]
+
+            if sums.size == 0:
+                self._growth[key] = 0.0
+            else:
+                diffs = np.abs(sums[:-1] - sums[1:]) / sums[1:]
+                self._growth[key] = round(float(diffs.sum() / sums.size), 4)
+
+        return self._growth[key]
+
+    def cadi(self) -> int:
+        _, sums = self.completed_years()
+        latest_first = sums[::-1]
+
+        drops = np.flatnonzero(latest_first[:-1] < latest_first[1:])
+
+        return int(drops[0] + 1) if drops.size > 0 else int(latest_first.size)
+
+    def projected_amount(self, growth_years: int = 5) -> float:
+        _, sums = self.completed_years()
+        last = float(sums[-1])
+
+        return last + last * self.growth(growth_years)
@@ -0,0 +1,146 @@
+from typing import Any, Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
+import threading
+import time
+
+
+class FetchError(Exception):
+    def __init__(self, message: str, attempts: int) -> None:
+        super().__init__(message)
+        self.attempts = attempts
+
+
+class RateLimiter:
+    def __init__(self, rate_per_sec: float, burst: int = 1) -> None:
+        assert rate_per_sec > 0, "Rate limit must be a positive number."
+
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns how long to wait before using it. Tokens may
+        be taken ahead, callers then wait in the order they reserved.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst,
+                self.tokens + (now - self.updated_at) * self.rate_per_sec,
+            )
+            self.updated_at = now
+            self.tokens -= 1
+
+            return max(0.0, -self.tokens / self.rate_per_sec)
+
+    def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host: str, rate_per_sec: float) -> RateLimiter:
+    """
+    The limiter shared by every client of `host`. A host has a single rate,
+    replacing its limiter would reset the budget other clients are sharing.
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(host)
+        if limiter is None:
+            limiter = RateLimiter(rate_per_sec)
+            _rate_limiters[host] = limiter
+
+        assert (
+            limiter.rate_per_sec == rate_per_sec
+        ), f"{host} is already limited to {limiter.rate_per_sec} requests per second."
+
+        return limiter
+
+
+class FetchReport:
+    def __init__(self) -> None:
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.attempts: Dict[str, int] = {}
+        self.elapsed_sec = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return len(self.errors) == 0
+
+    def summary(self) -> str:
+        return (
+            f"Fetched {len(self.results)} symbols, {len(self.errors)} failed "
+            f"in {round(self.elapsed_sec, 2)}s"
+        )
+
+
+class BulkFetcher:
+    def __init__(
+        self,
+        fetch: Callable[[str], Any],
+        concurrency: int = 8,
+        retries: int = 3,
+        backoff_sec: float = 0.5,
+        max_backoff_sec: float = 30.0,
+        keep_results: bool = True,
+    ) -> None:
+        assert concurrency > 0, "Concurrency must be a positive number."
+
+        self.fetch = fetch
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+        self.max_backoff_sec = max_backoff_sec
+        self.keep_results = keep_results
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter, so retrying workers do not hit the host in lockstep
+        return random.uniform(
+            0, min(self.max_backoff_sec, self.backoff_sec * 2**attempt)
+        )
+
+    def fetch_one(self, symbol: str) -> tuple:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return self.fetch(symbol), attempt
+            except Exception as err:
+                if attempt > self.retries:
+                    raise FetchError(str(err), attempt) from err
+
+                time.sleep(self.backoff(attempt - 1))
+
+    def run(self, symbols: List[str]) -> FetchReport:
+        report = FetchReport()
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self.fetch_one, symbol): symbol
+                for symbol in dict.fromkeys(symbols)
+            }
+
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    result, attempts = future.result()
+                    report.results[symbol] = result if self.keep_results else None
+                    report.attempts[symbol] = attempts
+                except FetchError as err:
+                    report.errors[symbol] = str(err)
+                    report.attempts[symbol] = err.attempts
+                    print(f"Error while fetching {symbol}: {err}")
+
+        report.elapsed_sec = time.monotonic() - start
+
+        return report
@@ -0,0 +1,120 @@
+from typing import Callable, List
+import time
+
+from src.cache import refresher, single_flight, CacheStore, MISSING
+
+
+# History is only ever extended, an entry is dropped after a year without use
+HISTORY_MAX_AGE_SEC = 60 * 60 * 24 * 365
+
+
+class HistoryStore:
+    """
+    Append-only bar histories (prices, dividends) keyed by `key`. Refreshing
+    an entry only fetches bars from its last stored bar onwards, so the cost
+    of a refresh grows with the time elapsed instead of the history length.
+    """
+
+    def __init__(
+        self, cache_dir: str, ttl_sec: int, stale_ttl_sec: int, key: str
+    ) -> None:
+        self.store = CacheStore(cache_dir, HISTORY_MAX_AGE_SEC)
+        self.ttl_sec = ttl_sec
+        self.stale_ttl_sec = stale_ttl_sec
+        self.key = key
+
+    def read(self, name: str) -> dict | None:
+        cached = self.store.read(name)
+        if cached is MISSING:
+            return None
+
+        entry, created_at = cached
+        if isinstance(entry, list):
+            # Entries written before histories were refreshed incrementally
+            entry = {"bars": entry, "refreshedAt": created_at}
+
+        return entry
+
+    def cache_key(self, name: str) -> str:
+        return self.store.key(name)
+
+    def empty(self) -> List[dict]:
+        return []
+
+    def peek(self, name: str) -> List[dict] | None:
+        entry = self.read(name)
+        return None if entry is None else entry["bars"]
+
+    def since(self, bars: List[dict]) -> int | None:
+        if len(bars) == 0:
+            return None
+
+        # The last bar may belong to a period that was still open and be keyed
+        # differently once the period closes, so the fetch overlaps one more bar
+        return bars[max(len(bars) - 2, 0)][self.key]
+
+    def merge(self, bars: List[dict], fetched: List[dict], since: int) -> List[dict]:
+        merged = {b[self.key]: b for b in bars}
+        if len(fetched) > 0:
+            merged = {k: b for k, b in merged.items() if k < since}
+            merged.update({b[self.key]: b for b in fetched})
+
+        return [merged[k] for k in sorted(merged)]
+
+    def write(self, name: str, bars: List[dict]) -> dict:
+        entry = {"bars": bars, "refreshedAt": int(time.time())}
+        self.store.write(name, entry)
+
+        return entry
+
+    def refresh(
+        self,
+        name: str,
+        fetch: Callable[[int | None], List[dict]],
+        max_age_sec: int = None,
+    ) -> dict:
+        max_age_sec = self.ttl_sec if max_age_sec is None else max_age_sec
+
+        entry = self.read(name)
+        if entry is not None and time.time() < entry["refreshedAt"] + max_age_sec:
+            return entry
+
+        bars = self.empty() if entry is None else entry["bars"]
+        since = self.since(bars)
+
+        print(f"Fetching {self.cache_key(name)} from source since {since}")
+
+        return self.write(name, self.merge(bars, fetch(since), since))
+
+    def get(
+        self,
+        name: str,
+        fetch: Callable[[int | None], List[dict]],
+        serve_stale: bool = True,
+    ) -> List[dict]:
+        cache_key = self.cache_key(name)
+
+        def refresh():
+            return single_flight.do(cache_key, lambda: self.refresh(name, fetch))
+
+        entry = self.read(name)
+        if self.blocking(entry, serve_stale):
+            return refresh()["bars"]
+
+        if time.time() >= entry["refreshedAt"] + self.ttl_sec:
+            refresher.schedule(cache_key, refresh)
+
+        return entry["bars"]
+
+    def blocking(self, entry: dict | None, serve_stale: bool = True) -> bool:
+        """
+        Whether `get` has to refresh the entry before returning it.
+        """
+        if entry is None:
+            return True
+
+        age = time.time() - entry["refreshedAt"]
+        if serve_stale:
+            return age >= self.ttl_sec + self.stale_ttl_sec
+
+        return age >= self.ttl_sec
@@ -0,0 +1,311 @@
+from typing import Dict, List
+import math
+import os
+import threading
+import numpy as np
+
+from src.cache import LRUCache
+
+
+INDICATOR_ENGINES_MAX_BYTES = int(
+    os.environ.get("INDICATOR_ENGINES_MAX_BYTES", 64 * 1024 * 1024)
+)
+
+# Each block is solved in closed form; longer blocks would overflow the weights
+EMA_BLOCK_SIZE = 128
+
+
+def ema_kernel(values: np.ndarray, alpha: float, seed: float = None) -> np.ndarray:
+    """
+    Exponential moving average y[i] = alpha * x[i] + (1 - alpha) * y[i - 1],
+    continuing from `seed` (the previous output) or starting at values[0].
+    Same result as pandas ewm(alpha=alpha, adjust=False).
+    """
+    out = np.empty(values.size)
+    if values.size == 0:
+        return out
+
+    start = 0
+    if seed is None or np.isnan(seed):
+        out[0] = seed = values[0]
+        start = 1
+
+    decay = 1 - alpha
+    for begin in range(start, values.size, EMA_BLOCK_SIZE):
+        block = values[begin : begin + EMA_BLOCK_SIZE]
+        powers = decay ** np.arange(1, block.size + 1)
+
+        # y[j] = decay^(j+1) * (seed + alpha * sum_k<=j x[k] / decay^(k+1))
+        weighted = np.cumsum(block / powers)
+        out[begin : begin + block.size] = powers * (seed + alpha * weighted)
+
+        seed = out[begin + block.size - 1]
+
+    return out
+
+
+class Column:
+    """
+    Growable float64 buffer, appending is amortized O(new values).
+    """
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.buffer = np.empty(capacity)
+        self.size = 0
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.buffer[: self.size]
+
+    def last(self) -> float:
+        return self.buffer[self.size - 1] if self.size > 0 else np.nan
+
+    def extend(self, values: np.ndarray) -> None:
+        if self.size + values.size > self.buffer.size:
+            buffer = np.empty(max(self.buffer.size * 2, self.size + values.size))
+            buffer[: self.size] = self.values
+            self.buffer = buffer
+
+        self.buffer[self.size : self.size + values.size] = values
+        self.size += values.size
+
+    def truncate(self, size: int) -> None:
+        self.size = min(self.size, size)
+
+
+class IndicatorEngine:
+    """
+    OHLCV bars and the indicators computed over them. Appending bars only
+    computes the indicators for the new bars, continuing from the state
+    stored at the last bar.
+    """
+
+    INPUTS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+    # Running state kept per bar, not reported
+    INTERNAL = ["close_sum", "close_sq_sum", "avg_gain", "avg_loss"]
+
+    def __init__(
+        self,
+        sma_periods: List[int] = (20, 50, 200),
+        ema_periods: List[int] = (12, 26),
+        rsi_period: int = 14,
+        macd: tuple = (12, 26, 9),
+        bollinger: tuple = (20, 2.0),
+        atr_period: int = 14,
+    ) -> None:
+        self.sma_periods = sma_periods
+        self.ema_periods = sorted(set(ema_periods) | set(macd[:2]))
+        self.rsi_period = rsi_period
+        self.macd = macd
+        self.bollinger = bollinger
+        self.atr_period = atr_period
+
+        names = (
+            self.INPUTS
+            + self.INTERNAL
+            + [f"sma_{p}" for p in sma_periods]
+            + [f"ema_{p}" for p in self.ema_periods]
+            + ["macd", "macd_signal", "macd_hist"]
+            + [f"rsi_{rsi_period}"]
+            + ["bb_upper", "bb_middle", "bb_lower"]
+            + [f"atr_{atr_period}"]
+        )
+        self.columns: Dict[str, Column] = {name: Column() for name in names}
+
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.columns["timestamp"].size
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name].values
+
+    def last_timestamp(self) -> float:
+        return self.columns["timestamp"].last()
+
+    def truncate(self, size: int) -> None:
+        for column in self.columns.values():
+            column.truncate(size)
+
+    def append(self, bars: Dict[str, np.ndarray]) -> None:
+        n = len(bars["timestamp"])
+        if n == 0:
+            return
+
+        c = self.columns
+        prev_close = c["close"].last()
+        prev_size = len(self)
+
+        for name in self.INPUTS:
+            c[name].extend(np.asarray(bars[name], dtype=np.float64))
+
+        close = c["close"].values[prev_size:]
+        high = c["high"].values[prev_size:]
+        low = c["low"].values[prev_size:]
+
+        # Running sums, so window sums are plain differences
+        c["close_sum"].extend(np.nan_to_num(c["close_sum"].last()) + np.cumsum(close))
+        c["close_sq_sum"].extend(
+            np.nan_to_num(c["close_sq_sum"].last()) + np.cumsum(close**2)
+        )
+
+        index = np.arange(prev_size, prev_size + n)
+
+        for p in self.sma_periods:
+            c[f"sma_{p}"].extend(self._window_mean("close_sum", index, p))
+
+        for p in self.ema_periods:
+            c[f"ema_{p}"].extend(ema_kernel(close, 2 / (p + 1), c[f"ema_{p}"].last()))
+
+        fast, slow, signal = self.macd
+        macd = c[f"ema_{fast}"].values[prev_size:] - c[f"ema_{slow}"].values[prev_size:]
+        macd_signal = ema_kernel(macd, 2 / (signal + 1), c["macd_signal"].last())
+        c["macd"].extend(macd)
+        c["macd_signal"].extend(macd_signal)
+        c["macd_hist"].extend(macd - macd_signal)
+
+        # Wilder's RSI, the average gain and loss are seeded with the mean of
+        # the first `rsi_period` changes and smoothed from there on
+        period = self.rsi_period
+        diff = np.diff(close, prepend=prev_close)
+
+        gain = np.full(n, np.nan)
+        loss = np.full(n, np.nan)
+        seed_gain, seed_loss = c["avg_gain"].last(), c["avg_loss"].last()
+
+        first = 0
+        if prev_size <= period:
+            first = period - prev_size
+            if first < n:
+                changes = np.diff(c["close"].values[: period + 1])
+                seed_gain = gain[first] = np.mean(np.clip(changes, 0, None))
+                seed_loss = loss[first] = np.mean(np.clip(-changes, 0, None))
+            first += 1
+
+        gain[first:] = ema_kernel(np.clip(diff[first:], 0, None), 1 / period, seed_gain)
+        loss[first:] = ema_kernel(
+            np.clip(-diff[first:], 0, None), 1 / period, seed_loss
+        )
+        c["avg_gain"].extend(gain)
+        c["avg_loss"].extend(loss)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+        rsi[np.isnan(gain)] = np.nan
+        c[f"rsi_{period}"].extend(rsi)
+
+        period, width = self.bollinger
+        middle = self._window_mean("close_sum", index, period)
+        mean_sq = self._window_mean("close_sq_sum", index, period)
+        std = np.sqrt(np.clip(mean_sq - middle**2, 0, None))
+        c["bb_middle"].extend(middle)
+        c["bb_upper"].extend(middle + width * std)
+        c["bb_lower"].extend(middle - width * std)
+
+        # Wilder smoothing for the ATR, the very first bar has no previous close
+        prev = np.concatenate(([prev_close], close[:-1]))
+        true_range = np.fmax(
+            high - low, np.fmax(np.abs(high - prev), np.abs(low - prev))
+        )
+        c[f"atr_{self.atr_period}"].extend(
+            ema_kernel(
+                true_range, 1 / self.atr_period, c[f"atr_{self.atr_period}"].last()
+            )
+        )
+
+    def _window_mean(self, sum_column: str, index: np.ndarray, period: int):
+        sums = self.columns[sum_column].values
+        mean = np.full(index.size, np.nan)
+
+        end = index[index >= period - 1]
+        before = np.where(end >= period, sums[np.maximum(end - period, 0)], 0)
+        mean[index >= period - 1] = (sums[end] - before) / period
+
+        return mean
+
+    def update(self, bars: Dict[str, np.ndarray]) -> None:
+        """
+        Merges `bars`, the full history, into the engine. Only new bars are
+        computed, unless a stored bar was revised or re-keyed, then everything
+        from the first bar that differs is recomputed.
+        """
+        with self.lock:
+            timestamps = np.asarray(bars["timestamp"], dtype=np.float64)
+            if timestamps.size == 0:
+                return
+
+            if len(self) == 0:
+                self.append(bars)
+                return
+
+            # Stored and incoming bars are compared over their overlap, a bar
+            # re-keyed when its period closed differs by timestamp
+            offset = int(np.searchsorted(self["timestamp"], timestamps[0]))
+            overlap = min(len(self) - offset, timestamps.size)
+
+            differs = np.zeros(overlap, dtype=bool)
+            for name in self.INPUTS:
+                stored = self[name][offset : offset + overlap]
+                incoming = np.asarray(bars[name][:overlap], dtype=np.float64)
+                differs |= (stored != incoming) & ~(
+                    np.isnan(stored) & np.isnan(incoming)
+                )
+
+            start = int(np.argmax(differs)) if differs.any() else overlap
+            self.truncate(offset + start)
+            self.append({name: bars[name][start:] for name in self.INPUTS})
+
+    def nbytes(self) -> int:
+        return sum(column.buffer.nbytes for column in self.columns.values())
+
+    def rows(self, limit: int = 1) -> List[Dict[str, float]]:
+        names = [n for n in self.columns if n not in self.INTERNAL]
+
+        # Under the lock, another request may be truncating the buffers
+        with self.lock:
+            size = len(self)
+
+            rows = []
+            for i in range(max(size - limit, 0), size):
+                values = {name: self.columns[name].buffer[i] for name in names}
+                rows.append(
+                    {k: None if np.isnan(v) else float(v) for k, v in values.items()}
+                )
+
+        return rows
+
+
+def drop_empty_bars(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Yahoo returns empty bars for days without trading
+    keep = ~np.isnan(columns["close"])
+    if keep.all():
+        return {name: columns[name] for name in IndicatorEngine.INPUTS}
+
+    return {name: columns[name][keep] for name in IndicatorEngine.INPUTS}
+
+
+# Engines of the most recently used (symbol, interval), bounded by their
+# buffer sizes
+_engines = LRUCache(INDICATOR_ENGINES_MAX_BYTES)
+_engines_lock = threading.Lock()
+
+
+def get_indicator_engine(
+    symbol: str, interval: str, columns: Dict[str, np.ndarray]
+) -> IndicatorEngine:
+    key = f"{symbol}:{interval}"
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = IndicatorEngine()
+            _engines.set(key, engine, engine.nbytes(), math.inf)
+
+    engine.update(drop_empty_bars(columns))
+
+    # Stored again so the LRU accounts for the buffers grown by the update
+    with _engines_lock:
+        _engines.set(key, engine, engine.nbytes(), math.inf)
+
+    return engine
@@ -0,0 +1,145 @@
+from typing import Dict, List
+from datetime import datetime
+from pathlib import Path
+import io
+import os
+import time
+import numpy as np
+
+from src.cache import atomic_write, LRUCache
+from src.history import HistoryStore, HISTORY_MAX_AGE_SEC
+
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+# Every mapped file holds a file descriptor, so only the recently used stay open
+PRICE_STORE_MAX_MAPS = int(os.environ.get("PRICE_STORE_MAX_MAPS", 512))
+
+# Prices fetched with the default interval were cached as prices_<symbol>
+LEGACY_DEFAULT_INTERVAL = "1mo"
+
+
+def to_columns(prices: List[dict]) -> np.ndarray:
+    columns = np.empty((len(COLUMNS), len(prices)))
+    for i, name in enumerate(COLUMNS):
+        columns[i] = [np.nan if p[name] is None else p[name] for p in prices]
+
+    return columns
+
+
+def to_rows(columns: np.ndarray) -> List[dict]:
+    def value(v: float, cast=float):
+        return None if np.isnan(v) else cast(v)
+
+    rows = []
+    for t, o, h, l, c, v in columns.T.tolist():
+        rows.append(
+            {
+                "timestamp": int(t),
+                "date": datetime.fromtimestamp(t).strftime("%d-%m-%Y"),
+                "open": value(o),
+                "close": value(c),
+                "high": value(h),
+                "low": value(l),
+                "volume": value(v, int),
+            }
+        )
+
+    return rows
+
+
+def legacy_names(name: str) -> List[str]:
+    suffix = f"_{LEGACY_DEFAULT_INTERVAL}"
+    return [name[: -len(suffix)]] if name.endswith(suffix) else []
+
+
+class PriceStore(HistoryStore):
+    """
+    Price histories stored column-wise, one `.npy` float64 array of shape
+    (len(COLUMNS), bars) per entry. Entries are memory mapped, so reading a
+    history only touches the pages used and columns are read-only views.
+    """
+
+    def __init__(self, cache_dir: str, ttl_sec: int, stale_ttl_sec: int) -> None:
+        super().__init__(cache_dir, ttl_sec, stale_ttl_sec, key="timestamp")
+        self.maps = LRUCache(PRICE_STORE_MAX_MAPS)
+
+    def path(self, name: str) -> Path:
+        return Path(f"{self.store.cache_dir}/{name}.npy")
+
+    def cache_key(self, name: str) -> str:
+        return str(self.path(name))
+
+    def empty(self) -> np.ndarray:
+        return np.empty((len(COLUMNS), 0))
+
+    def read(self, name: str) -> dict | None:
+        path = self.path(name)
+
+        try:
+            mtime = int(path.stat().st_mtime)
+        except FileNotFoundError:
+            return self.migrate(name)
+
+        if time.time() >= mtime + HISTORY_MAX_AGE_SEC:
+            return None
+
+        # The file is rewritten on every refresh, so its mtime is the refresh time
+        cached = self.maps.get(str(path))
+        if cached is None or cached[0] != mtime:
+            try:
+                cached = (mtime, np.load(path, mmap_mode="r"))
+            except FileNotFoundError:
+                return None
+
+            self.maps.set(str(path), cached, 1, float("inf"))
+
+        return {"bars": cached[1], "refreshedAt": mtime}
+
+    def migrate(self, name: str) -> dict | None:
+        # Entries written as lists of bars, before prices were stored by column.
+        # The default interval used to be left out of the entry name
+        for legacy in [name] + legacy_names(name):
+            entry = super().read(legacy)
+            if entry is None:
+                continue
+
+            self.write(name, to_columns(entry["bars"]))
+            os.utime(self.path(name), (entry["refreshedAt"], entry["refreshedAt"]))
+
+            self.store.delete(legacy)
+
+            return self.read(name)
+
+        return None
+
+    def since(self, bars: np.ndarray) -> int | None:
+        if bars.shape[1] == 0:
+            return None
+
+        return int(bars[0, max(bars.shape[1] - 2, 0)])
+
+    def merge(self, bars: np.ndarray, fetched: List[dict], since: int) -> np.ndarray:
+        if len(fetched) == 0:
+            return bars
+
+        kept = bars[:, bars[0] < since] if since is not None else self.empty()
+        merged = np.concatenate((kept, to_columns(fetched)), axis=1)
+        merged = merged[:, np.argsort(merged[0], kind="stable")]
+
+        # Fetched bars come last for equal timestamps, keep those
+        last = np.append(merged[0, 1:] != merged[0, :-1], True)
+
+        return merged[:, last]
+
+    def write(self, name: str, bars: np.ndarray) -> dict:
+        Path(self.store.cache_dir).mkdir(parents=True, exist_ok=True)
+
+        buffer = io.BytesIO()
+        np.save(buffer, np.ascontiguousarray(bars, dtype=np.float64))
+        atomic_write(self.path(name), buffer.getvalue())
+
+        return {"bars": bars, "refreshedAt": int(time.time())}
+
+    def columns(self, bars: np.ndarray) -> Dict[str, np.ndarray]:
+        return {name: bars[i] for i, name in enumerate(COLUMNS)}
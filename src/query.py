@@ -0,0 +1,304 @@
+from typing import Any, Dict, List, Tuple
+import heapq
+import math
+import numpy as np
+from pandas import DataFrame, Series
+
+
+OPERATORS = ["gt", "lt", "eq", "ne", "in", "not_in", "between"]
+
+# Used when a column has no statistics the operator can use
+DEFAULT_SELECTIVITY = 1 / 3
+
+
+class ColumnStats:
+    """
+    Statistics of a screen index column, used to estimate how many rows a
+    predicate keeps.
+    """
+
+    def __init__(self, column: Series) -> None:
+        self.size = len(column)
+        self.non_null = int(column.notna().sum())
+        self.distinct = max(int(column.nunique()), 1)
+
+        self.numeric = column.dtype.kind == "f"
+        if self.numeric and self.non_null > 0:
+            self.min = float(column.min())
+            self.max = float(column.max())
+        else:
+            self.min = self.max = None
+
+    def range_fraction(self, low: float, high: float) -> float:
+        if self.min is None:
+            return DEFAULT_SELECTIVITY
+
+        if self.max == self.min:
+            return 1.0 if low <= self.min <= high else 0.0
+
+        low, high = max(low, self.min), min(high, self.max)
+
+        return max(0.0, high - low) / (self.max - self.min)
+
+    def selectivity(self, operator: str, value: Any) -> float:
+        if self.size == 0:
+            return 0.0
+
+        match operator:
+            case "eq":
+                fraction = 1 / self.distinct
+            case "ne":
+                fraction = 1 - 1 / self.distinct
+            case "in":
+                fraction = min(1.0, len(value) / self.distinct)
+            case "not_in":
+                fraction = 1 - min(1.0, len(value) / self.distinct)
+            case "gt":
+                fraction = self.range_fraction(value, np.inf)
+            case "lt":
+                fraction = self.range_fraction(-np.inf, value)
+            case "between":
+                fraction = self.range_fraction(*value)
+            case _:
+                fraction = DEFAULT_SELECTIVITY
+
+        return fraction * self.non_null / self.size
+
+
+class Node:
+    def paths(self) -> List[str]:
+        raise NotImplementedError
+
+    def selectivity(self, stats: Dict[str, ColumnStats]) -> float:
+        raise NotImplementedError
+
+    def evaluate(self, frame: DataFrame, rows: np.ndarray, stats) -> np.ndarray:
+        """
+        Returns the positions in `rows` (sorted frame positions) matching the
+        node. Only the values of those rows are read.
+        """
+        raise NotImplementedError
+
+
+class Predicate(Node):
+    def __init__(self, path: str, operator: str, value: Any) -> None:
+        assert operator in OPERATORS, f"Unknown operator {operator}"
+
+        if operator == "between":
+            assert len(value) == 2, "Operator between takes a (low, high) pair."
+
+        self.path = path
+        self.operator = operator
+        self.value = value
+
+    def paths(self) -> List[str]:
+        return [self.path]
+
+    def selectivity(self, stats: Dict[str, ColumnStats]) -> float:
+        return stats[self.path].selectivity(self.operator, self.value)
+
+    def mask(self, column: Series) -> Series:
+        value = self.value
+
+        match self.operator:
+            case "gt":
+                return column > value
+            case "lt":
+                return column < value
+            case "eq":
+                return column == value
+            case "ne":
+                return (column != value) & column.notna()
+            case "in":
+                return column.isin(value)
+            case "not_in":
+                return ~column.isin(value) & column.notna()
+            case "between":
+                return column.between(value[0], value[1])
+
+    def evaluate(self, frame: DataFrame, rows: np.ndarray, stats) -> np.ndarray:
+        column = frame[self.path]
+        if len(rows) < len(frame):
+            column = column.iloc[rows]
+
+        return rows[self.mask(column).to_numpy(dtype=bool)]
+
+
+class And(Node):
+    def __init__(self, children: List[Node]) -> None:
+        self.children = children
+
+    def paths(self) -> List[str]:
+        return [p for child in self.children for p in child.paths()]
+
+    def selectivity(self, stats: Dict[str, ColumnStats]) -> float:
+        # Predicates are assumed independent
+        return float(np.prod([c.selectivity(stats) for c in self.children]))
+
+    def evaluate(self, frame: DataFrame, rows: np.ndarray, stats) -> np.ndarray:
+        # Most selective first, so the following ones scan the fewest rows
+        for child in sorted(self.children, key=lambda c: c.selectivity(stats)):
+            if len(rows) == 0:
+                break
+
+            rows = child.evaluate(frame, rows, stats)
+
+        return rows
+
+
+class Or(Node):
+    def __init__(self, children: List[Node]) -> None:
+        self.children = children
+
+    def paths(self) -> List[str]:
+        return [p for child in self.children for p in child.paths()]
+
+    def selectivity(self, stats: Dict[str, ColumnStats]) -> float:
+        miss = np.prod([1 - c.selectivity(stats) for c in self.children])
+        return float(1 - miss)
+
+    def evaluate(self, frame: DataFrame, rows: np.ndarray, stats) -> np.ndarray:
+        # Least selective first, rows it matches are not scanned again
+        matched = []
+        remaining = rows
+        for child in sorted(self.children, key=lambda c: -c.selectivity(stats)):
+            if len(remaining) == 0:
+                break
+
+            found = child.evaluate(frame, remaining, stats)
+            matched.append(found)
+            remaining = np.setdiff1d(remaining, found, assume_unique=True)
+
+        if len(matched) == 0:
+            return rows[:0]
+
+        return np.sort(np.concatenate(matched))
+
+
+class Not(Node):
+    def __init__(self, child: Node) -> None:
+        self.child = child
+
+    def paths(self) -> List[str]:
+        return self.child.paths()
+
+    def selectivity(self, stats: Dict[str, ColumnStats]) -> float:
+        return 1 - self.child.selectivity(stats)
+
+    def evaluate(self, frame: DataFrame, rows: np.ndarray, stats) -> np.ndarray:
+        found = self.child.evaluate(frame, rows, stats)
+        return np.setdiff1d(rows, found, assume_unique=True)
+
+
+def parse(query: Any) -> Node:
+    """
+    Builds the predicate tree of a screen. A list is the AND of its items, an
+    item is a (path, operator, value) predicate or a nested ("and" | "or",
+    [...]) or ("not", item). Tuples and lists are interchangeable, so screens
+    decoded from JSON parse the same way.
+    """
+    if isinstance(query, Node):
+        return query
+
+    assert isinstance(query, (tuple, list)), f"Invalid query {query}"
+
+    if len(query) == 0 or not isinstance(query[0], str):
+        return And([parse(q) for q in query])
+
+    match query[0]:
+        case "and":
+            return And([parse(q) for q in query[1]])
+        case "or":
+            return Or([parse(q) for q in query[1]])
+        case "not":
+            return Not(parse(query[1]))
+
+    assert len(query) == 3, f"Invalid predicate {query}"
+
+    return Predicate(*query)
+
+
+def execute(query: Any, frame: DataFrame, stats: Dict[str, ColumnStats]):
+    """
+    Positions of the frame rows matching the query.
+    """
+    return parse(query).evaluate(frame, np.arange(len(frame)), stats)
+
+
+class Descending:
+    """
+    Sort key wrapper reversing the order of any comparable value, numeric or
+    not.
+    """
+
+    __slots__ = ["value"]
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: "Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: "Descending") -> bool:
+        return self.value == other.value
+
+
+def parse_sort(sort: str | List[str] | None) -> List[Tuple[str, bool]]:
+    """
+    Sort keys as (column, descending) pairs. A "-" prefix sorts the column in
+    descending order, a comma separated string is split into keys.
+    """
+    if sort is None:
+        return []
+
+    if isinstance(sort, str):
+        sort = sort.split(",")
+
+    keys = []
+    for key in sort:
+        assert isinstance(key, str), f"Invalid sort key {key}"
+
+        key = key.strip()
+        column = key.lstrip("+-")
+        assert column != "", f"Invalid sort key {key}"
+
+        keys.append((column, key.startswith("-")))
+
+    return keys
+
+
+def is_missing(value: Any) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def top_k(
+    columns: List[np.ndarray],
+    descending: List[bool],
+    rows: np.ndarray,
+    limit: int | None = None,
+) -> np.ndarray:
+    """
+    Orders `rows` by the sort `columns`, missing values last whatever the
+    direction. With a `limit`, only the first rows are kept in a bounded heap
+    while scanning the matches instead of sorting all of them.
+    """
+    values = [column[rows].tolist() for column in columns]
+
+    def key(i: int) -> tuple:
+        parts = []
+        for column, desc in zip(values, descending):
+            value = column[i]
+            if is_missing(value):
+                parts += [True, None]
+            else:
+                parts += [False, Descending(value) if desc else value]
+
+        return tuple(parts)
+
+    positions = range(len(rows))
+    if limit is None:
+        order = sorted(positions, key=key)
+    else:
+        order = heapq.nsmallest(limit, positions, key=key)
+
+    return rows[np.array(order, dtype=np.int64)]
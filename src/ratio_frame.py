@@ -0,0 +1,94 @@
+from typing import Dict, List
+import numpy as np
+from pandas import DataFrame
+
+from src.dividends import DividendSeries
+from src.screen_index import ScreenIndex
+from src.yahoo_finance import YahooFinance
+
+
+# Column name -> dotted quoteSummary path, mirroring the Ticker accessors
+RATIO_PATHS: Dict[str, str] = {
+    "company_name": "quoteType.shortName",
+    "industry": "assetProfile.industry",
+    "sector": "assetProfile.sector",
+    "exchange": "price.exchange",
+    "currency": "summaryDetail.currency",
+    "regular_market_price": "price.regularMarketPrice.raw",
+    "dividend_yield": "summaryDetail.dividendYield.raw",
+    "five_year_avg_dividend_yield": "summaryDetail.fiveYearAvgDividendYield.raw",
+    "beta": "defaultKeyStatistics.beta.raw",
+    "market_cap": "summaryDetail.marketCap.raw",
+    "pe_ratio": "summaryDetail.trailingPE.raw",
+    "eps_ratio": "defaultKeyStatistics.trailingEps.raw",
+    "peg_ratio": "defaultKeyStatistics.pegRatio.raw",
+    "profit_margin": "defaultKeyStatistics.profitMargins.raw",
+    "debt_to_equity_pct": "financialData.debtToEquity.raw",
+    "ex_dividend_date": "calendarEvents.exDividendDate.raw",
+    "next_dividend_date": "calendarEvents.dividendDate.raw",
+}
+
+
+class RatioFrame:
+    """
+    Ticker ratios for a whole universe as one table, built from the screen
+    index in a single pass over the cache. Derived metrics are computed as
+    column expressions instead of per symbol.
+    """
+
+    def __init__(
+        self, index: ScreenIndex = None, yahoo_finance: YahooFinance = None
+    ) -> None:
+        self.index = ScreenIndex() if index is None else index
+        self.yf = YahooFinance() if yahoo_finance is None else yahoo_finance
+
+    def build(
+        self,
+        symbols: List[str] = None,
+        with_dividends: bool = True,
+        ror: float = 0.1,
+    ) -> DataFrame:
+        self.index.add_paths(list(RATIO_PATHS.values()))
+        self.index.refresh()
+
+        frame = self.index.frame
+        if symbols is not None:
+            frame = frame[frame["symbol"].isin(symbols)]
+
+        df = DataFrame(
+            {
+                "symbol": frame["symbol"].to_numpy(),
+                **{name: frame[path].to_numpy() for name, path in RATIO_PATHS.items()},
+            }
+        )
+
+        # Price for London stock exchange is calculated in penny
+        df["current_price"] = np.where(
+            df["exchange"] == "LSE",
+            df["regular_market_price"] / 100,
+            df["regular_market_price"],
+        )
+        df["dividend_yield"] = df["dividend_yield"].fillna(0)
+        df["trailing_average_div_yield"] = df["five_year_avg_dividend_yield"] / 100
+        df["debt_to_equity"] = df["debt_to_equity_pct"] / 100
+        df["ratios_valuation_model"] = (
+            df["eps_ratio"] * (1 + df["peg_ratio"] / 100) * df["pe_ratio"]
+        )
+
+        if with_dividends:
+            df["dividend_growth"] = self.dividend_growth(df["symbol"], 10)
+            df["dividend_discount_model"] = (
+                df["dividend_yield"] * df["current_price"] / 100
+            ) / (ror - df["dividend_growth"])
+
+        return df
+
+    def dividend_growth(self, symbols: List[str], last_years: int) -> np.ndarray:
+        # Only cached histories are used, a cold symbol is left as NaN
+        growth = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            dividends = self.yf.peek_historic_dividends(symbol)
+            if dividends:
+                growth[i] = DividendSeries(dividends).growth(last_years)
+
+        return growth
@@ -0,0 +1,308 @@
+from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import multiprocessing
+import os
+import pickle
+import numpy as np
+from pandas import DataFrame, Series, to_numeric
+from src.cache import atomic_write, load_cache_data, serializer_for
+from src.cache_backends import create_backend, get_backend
+from src.query import parse, parse_sort, top_k, ColumnStats, Predicate
+
+
+INDEX_VERSION = 2
+
+SCREEN_WORKERS = int(os.environ.get("SCREEN_WORKERS", os.cpu_count() or 1))
+
+# Below this many entries to extract, starting worker processes costs more
+PARALLEL_MIN_ENTRIES = 256
+
+# Workers are not forked, a fork of a threaded server inherits the locks and
+# backend connections held by its other threads
+SCREEN_MP_CONTEXT = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+DEFAULT_PATHS = [
+    "defaultKeyStatistics.trailingPE.raw",
+    "defaultKeyStatistics.pegRatio.raw",
+    "summaryDetail.dividendYield.raw",
+    "assetProfile.sector",
+    "assetProfile.industry",
+]
+
+
+def lookup(result: dict, path: str) -> Any:
+    value = result
+    for key in path.split("."):
+        try:
+            value = value[int(key) if isinstance(value, list) else key]
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+    return value
+
+
+def projection(fields: List[str] | Dict[str, str] | None) -> Dict[str, str]:
+    # Column name -> dotted path, a list of paths is named after the paths
+    if fields is None:
+        return {}
+
+    if not isinstance(fields, dict):
+        fields = {path: path for path in fields}
+
+    for column, path in fields.items():
+        assert isinstance(path, str), f"Invalid field {column}"
+        assert column != "symbol" and path != "symbol", "Symbol is always returned."
+
+    return dict(fields)
+
+
+def extract_row(name: str, ticker: dict, paths: List[str]) -> Dict[str, Any]:
+    result = lookup(ticker, "quoteSummary.result.0")
+    if result is None:
+        result = {}
+
+    symbol = lookup(result, "quoteType.symbol")
+    if symbol is None:
+        symbol = name[len("ticker_") :]
+
+    return {"symbol": symbol, **{p: lookup(result, p) for p in paths}}
+
+
+def extract_shard(
+    cache_folder: str,
+    entries: List[Tuple[str, str]],
+    paths: List[str],
+    backend=None,
+) -> List[Tuple[str, dict]]:
+    """
+    Reads and parses the (name, key) entries, returning only the indexed paths
+    of each. Worker processes pass no `backend` and open their own.
+    """
+    backend = create_backend(cache_folder) if backend is None else backend
+    serializer = serializer_for(backend)
+
+    rows = []
+    for name, key in entries:
+        stored = backend.get(key)
+        if stored is None:
+            continue
+
+        try:
+            result = load_cache_data(stored[0], serializer)
+        except ValueError as err:
+            print(f"Skipping cache entry {key}: {err}")
+            continue
+
+        rows.append((name, extract_row(name, result, paths)))
+
+    return rows
+
+
+class ScreenIndex:
+    """
+    Columnar view over the cached quoteSummary payloads.
+
+    Every `ticker_*` entry in the cache backend is parsed once and only the
+    dotted paths used in screens are kept. The extracted rows are persisted in
+    `cache_folder` and re-extracted only for entries whose creation time
+    changed. Large re-extractions are sharded across `workers` processes.
+    """
+
+    def __init__(
+        self,
+        cache_folder: str = "./cache",
+        paths: List[str] = None,
+        index_file: str = "screen_index.pkl",
+        workers: int = SCREEN_WORKERS,
+    ) -> None:
+        self.cache_folder = cache_folder
+        self.workers = max(1, workers)
+        self.index_path = Path(cache_folder) / index_file
+        self.backend = get_backend(cache_folder)
+
+        self.paths: List[str] = []
+        self.rows: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._frame = None
+        self._stats = None
+
+        self.load()
+        self.add_paths(DEFAULT_PATHS if paths is None else paths)
+
+    def load(self) -> None:
+        if not self.index_path.is_file():
+            return
+
+        try:
+            with open(self.index_path, "rb") as file:
+                state = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return
+
+        if state.get("version") != INDEX_VERSION:
+            return
+
+        self.paths = state["paths"]
+        self.rows = state["rows"]
+
+    def save(self) -> None:
+        Path(self.cache_folder).mkdir(parents=True, exist_ok=True)
+
+        atomic_write(
+            self.index_path,
+            pickle.dumps(
+                {"version": INDEX_VERSION, "paths": self.paths, "rows": self.rows},
+                protocol=pickle.HIGHEST_PROTOCOL,
+            ),
+        )
+
+    def add_paths(self, paths: List[str]) -> None:
+        new_paths = [p for p in dict.fromkeys(paths) if p not in self.paths]
+        if len(new_paths) == 0:
+            return
+
+        # A new column needs a value for every row, so all rows are re-extracted
+        self.paths = self.paths + new_paths
+        self.rows = {}
+        self._frame = None
+
+    def refresh(self) -> bool:
+        # Keyed by entry name, so a legacy `.json` entry being migrated to the
+        # binary format is only read once
+        files = {}
+        for key, created_at in self.backend.scan("ticker_").items():
+            name = Path(key).stem
+            if name not in files or files[name][0] < created_at:
+                files[name] = (created_at, key)
+
+        removed = [name for name in self.rows if name not in files]
+        for name in removed:
+            del self.rows[name]
+
+        changed = [
+            name
+            for name, (mtime, _) in files.items()
+            if name not in self.rows or self.rows[name][0] != mtime
+        ]
+        for name, row in self.extract_all([(n, files[n][1]) for n in changed]):
+            self.rows[name] = (files[name][0], row)
+
+        if len(removed) == 0 and len(changed) == 0:
+            return False
+
+        self._frame = None
+        self.save()
+
+        return True
+
+    def extract_all(self, entries: List[Tuple[str, str]]) -> List[Tuple[str, dict]]:
+        if self.workers == 1 or len(entries) < PARALLEL_MIN_ENTRIES:
+            return extract_shard(self.cache_folder, entries, self.paths, self.backend)
+
+        # Several shards per worker, so a slow shard does not hold the others
+        size = -(-len(entries) // (self.workers * 4))
+        shards = [entries[i : i + size] for i in range(0, len(entries), size)]
+
+        rows = []
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(SCREEN_MP_CONTEXT),
+        ) as executor:
+            futures = [
+                executor.submit(extract_shard, self.cache_folder, shard, self.paths)
+                for shard in shards
+            ]
+            for future in futures:
+                rows += future.result()
+
+        return rows
+
+    def extract(self, name: str, ticker: dict) -> Dict[str, Any]:
+        return extract_row(name, ticker, self.paths)
+
+    @property
+    def frame(self) -> DataFrame:
+        if self._frame is None:
+            frame = DataFrame(
+                [values for _, values in self.rows.values()],
+                columns=["symbol"] + self.paths,
+            )
+
+            # Keep numeric columns as float64 so comparisons run vectorized
+            for path in self.paths:
+                try:
+                    frame[path] = to_numeric(frame[path]).astype("float64")
+                except (ValueError, TypeError):
+                    pass
+
+            self._frame = frame
+
+        return self._frame
+
+    @property
+    def stats(self) -> Dict[str, ColumnStats]:
+        if self._stats is None or self._stats[0] is not self.frame:
+            frame = self.frame
+            self._stats = (frame, {p: ColumnStats(frame[p]) for p in self.paths})
+
+        return self._stats[1]
+
+    def mask(self, path: str, operator: str, value: Any) -> Series:
+        return Predicate(path, operator, value).mask(self.frame[path])
+
+    def query(
+        self,
+        queries: List[Tuple],
+        fields: List[str] | Dict[str, str] = None,
+        sort: str | List[str] = None,
+        limit: int = None,
+        symbols: List[str] = None,
+        extend: bool = True,
+    ) -> DataFrame:
+        """
+        Runs a screen and returns the matches as a table of `symbol` and the
+        projected `fields`, dotted paths or a {column: path} mapping. `sort`
+        takes columns or paths, "-" prefixed for descending, and `limit` keeps
+        only the top rows. `symbols` restricts the screen to a universe.
+
+        Paths not indexed yet are added to the index, which re-extracts every
+        entry, or rejected without `extend`.
+        """
+        node = parse(queries)
+        columns = projection(fields)
+        keys = parse_sort(sort)
+        assert limit is None or limit >= 0, "Limit must be a positive number."
+
+        sort_paths = [columns.get(column, column) for column, _ in keys]
+        paths = node.paths() + list(columns.values()) + sort_paths
+        paths = [p for p in paths if p != "symbol"]
+
+        if extend:
+            self.add_paths(paths)
+        else:
+            unknown = [p for p in dict.fromkeys(paths) if p not in self.paths]
+            assert len(unknown) == 0, f"Unknown paths {', '.join(unknown)}."
+
+        self.refresh()
+
+        frame = self.frame
+        rows = np.arange(len(frame))
+        if symbols is not None:
+            rows = rows[frame["symbol"].isin(symbols).to_numpy()]
+
+        rows = node.evaluate(frame, rows, self.stats)
+        if len(keys) > 0 or limit is not None:
+            rows = top_k(
+                [frame[p].to_numpy() for p in sort_paths],
+                [desc for _, desc in keys],
+                rows,
+                limit,
+            )
+
+        return DataFrame(
+            {
+                "symbol": frame["symbol"].to_numpy()[rows],
+                **{c: frame[p].to_numpy()[rows] for c, p in columns.items()},
+            }
+        )
@@ -1,90 +1,82 @@
-from typing import List, Tuple, Generator
-from subprocess import Popen, PIPE
-import os
-from pytickersymbols import PyTickerSymbols
+from typing import Dict, List, Tuple, Generator
+from pandas import DataFrame
 from os import walk
-import json
-from src.utils import safeget
+from src.fetcher import BulkFetcher, FetchReport
+from src.screen_index import ScreenIndex, SCREEN_WORKERS
+from src.universe import get_universe
+from src.yahoo_finance import YahooFinance, QUERY1_URL, QUERY2_URL
+
+
+# Indices scraped when none are given
+DEFAULT_INDICES = ["FTSE 100", "S&P 500"]
 
 
 class Screener:
-    def __init__(self, cache_folder: str = "./cache") -> None:
-        self.markets = PyTickerSymbols()
+    def __init__(
+        self,
+        cache_folder: str = "./cache",
+        workers: int = None,
+        query1_url: str = QUERY1_URL,
+        query2_url: str = QUERY2_URL,
+    ) -> None:
+        self.universe = get_universe(cache_folder)
 
         self.cache_folder = cache_folder
-        self.scraper_executable = "./scraper"
+        self.query1_url = query1_url
+        self.query2_url = query2_url
+        self.index = ScreenIndex(
+            cache_folder, workers=SCREEN_WORKERS if workers is None else workers
+        )
 
     def get_ftse_100(self) -> List[str]:
-        def extracy_symbol(universe):
-            for ticker in universe:
-                for s in ticker["symbols"]:
-                    if s["currency"] == "GBP":
-                        yield s["yahoo"]
-
-        return list(
-            extracy_symbol([s for s in self.markets.get_stocks_by_index("FTSE 100")])
-        )
+        return self.universe.symbols("FTSE 100")
 
     def get_snp_500(self) -> List[str]:
-        return [s["symbol"] for s in self.markets.get_stocks_by_index("S&P 500")]
+        return self.universe.symbols("S&P 500")
 
-    def scrape(self) -> bool:
-        stocks = self.get_ftse_100() + self.get_snp_500()
+    def scrape(
+        self,
+        concurrency: int = 8,
+        rate_limit: float = 10,
+        retries: int = 3,
+        indices: str | List[str] = None,
+    ) -> FetchReport:
+        stocks = self.universe.symbols(DEFAULT_INDICES if indices is None else indices)
 
-        my_env = os.environ.copy()
-        my_env["CACHE_PATH"] = self.cache_folder
-        process = Popen(
-            self.scraper_executable + " " + " ".join(stocks),
-            stdout=PIPE,
-            stderr=PIPE,
-            shell=True,
-            env=my_env,
+        # Scraped into the folder the screens read from
+        yf = YahooFinance(
+            rate_limit=rate_limit,
+            serve_stale=False,
+            query1_url=self.query1_url,
+            query2_url=self.query2_url,
+            cache_dir=self.cache_folder,
+        )
+        fetcher = BulkFetcher(
+            yf.get_ticker_info,
+            concurrency=concurrency,
+            retries=retries,
+            keep_results=False,
         )
-        (output, err) = process.communicate()
-        return process.wait() == 0
+
+        report = fetcher.run(stocks)
+        print(report.summary())
+
+        return report
 
     def get_cached_files(self) -> Generator:
         for _, _, filenames in walk(self.cache_folder):
             for f in filenames:
                 yield f"{self.cache_folder}/{f}"
 
-    def query(self, queries: List[Tuple]) -> List[str]:
-        results = []
-        for q in queries:
-            if len(results) == 0:
-                files = list(self.get_cached_files())
-            else:
-                files = [f"{self.cache_folder}/ticker_{f}.json" for f in results]
-
-            results = []
-            for f in files:
-                with open(f, "r") as o:
-                    ticker = json.load(o)
-
-                    symbol = safeget(
-                        ticker,
-                        "quoteSummary",
-                        "result",
-                        0,
-                        "quoteType",
-                        "symbol",
-                    )
-                    val = safeget(ticker, "quoteSummary", "result", 0, *q[0].split("."))
-                    if val is None:
-                        continue
-
-                    match q[1]:
-                        case "gt":
-                            if val > q[2]:
-                                results.append(symbol)
-                        case "lt":
-                            if val < q[2]:
-                                results.append(symbol)
-                        case "eq":
-                            if val == q[2]:
-                                results.append(symbol)
-                        case "in":
-                            if val in q[2]:
-                                results.append(symbol)
+    def query(
+        self,
+        queries: List[Tuple],
+        fields: List[str] | Dict[str, str] = None,
+        sort: str | List[str] = None,
+        limit: int = None,
+        indices: str | List[str] = None,
+    ) -> DataFrame:
+        # Without indices, every cached ticker is screened
+        symbols = None if indices is None else self.universe.symbols(indices)
 
-        return results
+        return self.index.query(queries, fields, sort, limit, symbols)
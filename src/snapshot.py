@@ -0,0 +1,156 @@
+from typing import Any, Callable, Dict
+
+
+class Field:
+    """
+    Lazily decoded record field. The value is read from the module payload on
+    first access and kept in the record's `_<name>` slot.
+    """
+
+    def __init__(self, key: str, part: str = "raw") -> None:
+        self.key = key
+        self.part = part
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = f"_{name}"
+
+    def __get__(self, record: "Record", owner: type = None) -> Any:
+        if record is None:
+            return self
+
+        try:
+            return getattr(record, self.slot)
+        except AttributeError:
+            value = self.decode(record.data)
+            setattr(record, self.slot, value)
+
+            return value
+
+    def decode(self, data: dict) -> Any:
+        value = data.get(self.key)
+
+        # Numbers come as {"raw": 1.5, "fmt": "1.50"}, empty ones as {}
+        if self.part is not None and isinstance(value, dict):
+            return value.get(self.part)
+
+        return value
+
+
+def record(name: str, **fields: Field) -> type:
+    """
+    Builds a record class with a slot per field, so records carry no instance
+    dict and only keep the payload of their own module.
+    """
+    slots = ("data",) + tuple(f"_{field}" for field in fields)
+
+    def __init__(self, data: dict) -> None:
+        self.data = {} if data is None else data
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in fields}
+
+    attrs = {"__slots__": slots, "__init__": __init__, "as_dict": as_dict}
+
+    return type(name, (Record,), {**attrs, **fields})
+
+
+class Record:
+    __slots__ = ()
+
+
+QuoteType = record("QuoteType", short_name=Field("shortName", None))
+
+Price = record(
+    "Price",
+    exchange=Field("exchange", None),
+    regular_market_price=Field("regularMarketPrice"),
+)
+
+SummaryDetail = record(
+    "SummaryDetail",
+    currency=Field("currency", None),
+    dividend_yield=Field("dividendYield"),
+    trailing_annual_dividend_yield=Field("trailingAnnualDividendYield"),
+    five_year_avg_dividend_yield=Field("fiveYearAvgDividendYield"),
+    market_cap=Field("marketCap"),
+    trailing_pe=Field("trailingPE"),
+)
+
+KeyStatistics = record(
+    "KeyStatistics",
+    beta=Field("beta"),
+    profit_margins=Field("profitMargins"),
+    trailing_eps=Field("trailingEps"),
+    peg_ratio=Field("pegRatio"),
+)
+
+FinancialData = record("FinancialData", debt_to_equity=Field("debtToEquity"))
+
+AssetProfile = record(
+    "AssetProfile",
+    industry=Field("industry", None),
+    sector=Field("sector", None),
+)
+
+CalendarEvents = record(
+    "CalendarEvents",
+    ex_dividend_date=Field("exDividendDate"),
+    ex_dividend_date_fmt=Field("exDividendDate", "fmt"),
+    dividend_date=Field("dividendDate"),
+    dividend_date_fmt=Field("dividendDate", "fmt"),
+)
+
+
+class Module:
+    """
+    Snapshot attribute holding the record of a quoteSummary module, built from
+    the module payload the first time it is read.
+    """
+
+    def __init__(self, module: str, record_class: type) -> None:
+        self.module = module
+        self.record_class = record_class
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.slot = f"_{name}"
+
+    def __get__(self, snapshot: "Snapshot", owner: type = None) -> Record:
+        if snapshot is None:
+            return self
+
+        try:
+            return getattr(snapshot, self.slot)
+        except AttributeError:
+            value = self.record_class(snapshot.loader(self.module))
+            setattr(snapshot, self.slot, value)
+
+            return value
+
+
+class Snapshot:
+    """
+    Typed view over a quoteSummary result, `loader` returns the payload of a
+    module by name.
+    """
+
+    __slots__ = (
+        "loader",
+        "_quote_type",
+        "_price",
+        "_summary_detail",
+        "_key_statistics",
+        "_financial_data",
+        "_asset_profile",
+        "_calendar_events",
+    )
+
+    quote_type = Module("quoteType", QuoteType)
+    price = Module("price", Price)
+    summary_detail = Module("summaryDetail", SummaryDetail)
+    key_statistics = Module("defaultKeyStatistics", KeyStatistics)
+    financial_data = Module("financialData", FinancialData)
+    asset_profile = Module("assetProfile", AssetProfile)
+    calendar_events = Module("calendarEvents", CalendarEvents)
+
+    def __init__(self, loader: Callable[[str], dict]) -> None:
+        self.loader = loader
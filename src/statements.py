@@ -0,0 +1,141 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.snapshot import Field
+
+
+PERIODS = ["annual", "quarterly"]
+
+FORMATS = ["rows", "columns"]
+
+
+def compile_extractor(fields: List[Tuple[str, Field]]) -> Callable[[dict], dict]:
+    # Bound once, so extracting a row is a single pass over the fields
+    decoders = tuple((name, field.decode) for name, field in fields)
+
+    def extract(statement: dict) -> Dict[str, Any]:
+        return {name: decode(statement) for name, decode in decoders}
+
+    return extract
+
+
+class StatementSchema:
+    """
+    Fields of a financial statement, as (output name, Field) pairs. Yahoo
+    serves the annual and quarterly statements in separate modules holding
+    the same fields.
+    """
+
+    def __init__(self, module: str, list_key: str, fields: List[Tuple[str, Field]]):
+        self.modules = {"annual": module, "quarterly": f"{module}Quarterly"}
+        self.list_key = list_key
+        self.names = [name for name, _ in fields]
+        self.extract = compile_extractor(fields)
+
+    def rows(self, payload: dict) -> List[Dict[str, Any]] | None:
+        statements = None if payload is None else payload.get(self.list_key)
+        if statements is None:
+            return None
+
+        return [self.extract(s) for s in statements]
+
+    def columns(self, rows: List[dict]) -> Dict[str, List[Any]]:
+        return {name: [row[name] for row in rows] for name in self.names}
+
+
+INCOME_STATEMENT = StatementSchema(
+    "incomeStatementHistory",
+    "incomeStatementHistory",
+    [
+        ("date", Field("endDate", "fmt")),
+        ("total_revenue", Field("totalRevenue")),
+        ("cost_of_revenue", Field("costOfRevenue")),
+        ("gross_profit", Field("grossProfit")),
+        ("research_development", Field("researchDevelopment")),
+        ("selling_general_administrative", Field("sellingGeneralAdministrative")),
+        ("total_operating_expenses", Field("totalOperatingExpenses")),
+        ("operating_income", Field("operatingIncome")),
+        ("total_other_income_expense_net", Field("totalOtherIncomeExpenseNet")),
+        ("ebit", Field("ebit")),
+        ("interest_expense", Field("interestExpense")),
+        ("income_before_tax", Field("incomeBeforeTax")),
+        ("income_tax_expense", Field("incomeTaxExpense")),
+        ("net_income_from_continuing_ops", Field("netIncomeFromContinuingOps")),
+        ("net_income", Field("netIncome")),
+        (
+            "net_income_applicable_to_common_shares",
+            Field("netIncomeApplicableToCommonShares"),
+        ),
+    ],
+)
+
+BALANCE_SHEET = StatementSchema(
+    "balanceSheetHistory",
+    "balanceSheetStatements",
+    [
+        ("date", Field("endDate", "fmt")),
+        ("cash", Field("cash")),
+        ("short_term_investments", Field("shortTermInvestments")),
+        ("net_receivables", Field("netReceivables")),
+        ("inventory", Field("inventory")),
+        ("other_current_assets", Field("otherCurrentAssets")),
+        ("total_current_assets", Field("totalCurrentAssets")),
+        ("long_term_investments", Field("longTermInvestments")),
+        ("property_plant_equipment", Field("propertyPlantEquipment")),
+        ("other_assets", Field("otherAssets")),
+        ("total_assets", Field("totalAssets")),
+        ("accounts_payable", Field("accountsPayable")),
+        ("short_long_term_debt", Field("shortLongTermDebt")),
+        ("other_current_liab", Field("otherCurrentLiab")),
+        ("long_term_debt", Field("longTermDebt")),
+        ("other_liab", Field("otherLiab")),
+        ("total_current_liabilities", Field("totalCurrentLiabilities")),
+        ("total_liab", Field("totalLiab")),
+        ("common_stock", Field("commonStock")),
+        ("retained_earnings", Field("retainedEarnings")),
+        ("treasury_stock", Field("treasuryStock")),
+        ("other_stockholder_equity", Field("otherStockholderEquity")),
+        ("total_stockholder_equity", Field("totalStockholderEquity")),
+        ("net_tangible_assets", Field("netTangibleAssets")),
+    ],
+)
+
+CASH_FLOW = StatementSchema(
+    "cashflowStatementHistory",
+    "cashflowStatements",
+    [
+        ("date", Field("endDate", "fmt")),
+        ("net_income", Field("netIncome")),
+        ("depreciation", Field("depreciation")),
+        ("change_to_net_income", Field("changeToNetincome")),
+        ("change_to_account_receivables", Field("changeToAccountReceivables")),
+        ("change_to_liabilities", Field("changeToLiabilities")),
+        ("change_to_inventory", Field("changeToInventory")),
+        ("change_to_operating_activities", Field("changeToOperatingActivities")),
+        (
+            "total_cash_from_operating_activities",
+            Field("totalCashFromOperatingActivities"),
+        ),
+        ("capital_expenditures", Field("capitalExpenditures")),
+        ("investments", Field("investments")),
+        (
+            "other_cashflows_from_investing_activities",
+            Field("otherCashflowsFromInvestingActivities"),
+        ),
+        (
+            "total_cashflows_from_investing_activities",
+            Field("totalCashflowsFromInvestingActivities"),
+        ),
+        ("dividends_paid", Field("dividendsPaid")),
+        ("net_borrowings", Field("netBorrowings")),
+        (
+            "other_cashflows_from_financing_activities",
+            Field("otherCashflowsFromFinancingActivities"),
+        ),
+        (
+            "total_cash_from_financing_activities",
+            Field("totalCashFromFinancingActivities"),
+        ),
+        ("change_in_cash", Field("changeInCash")),
+        ("repurchase_of_stock", Field("repurchaseOfStock")),
+    ],
+)
@@ -1,8 +1,10 @@
 from typing import Dict
 from src.utils import safeget
 from src.yahoo_finance import YahooFinance
+from src.dividends import DividendSeries
+from src.snapshot import Snapshot
+from src.indicators import get_indicator_engine, IndicatorEngine
 from datetime import datetime
-from src.utils import calc_percentage_diff
 
 
 class Ticker:
@@ -12,202 +14,80 @@ class Ticker:
 
     historic_dividends = None
 
+    dividend_series = None
+
     def __init__(self, symbol: str, yahoo_finance: YahooFinance = None) -> None:
         self.symbol = symbol
         self.yf = YahooFinance() if yahoo_finance is None else yahoo_finance
+        self.loaded_modules = set()
+        self.snapshot = Snapshot(self.get_module)
 
-    def get_company_name(self) -> str:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
+    def load_modules(self, *modules: str) -> None:
+        # Callers about to read several modules should load them together, so
+        # the missing ones are fetched in a single upstream request
+        missing = [m for m in modules if m not in self.loaded_modules]
+        if len(missing) == 0:
+            return
 
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "quoteType",
-            "shortName",
+        # Modules loaded earlier are requested again in case the cached entry
+        # expired in between, fresh ones are not fetched twice
+        self.loaded_modules.update(missing)
+        self.ticker_info = self.yf.get_ticker_modules(
+            self.symbol, sorted(self.loaded_modules)
         )
 
-    def get_dividend_yield(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
+    def get_module(self, module: str) -> dict:
+        self.load_modules(module)
 
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "trailingAnnualDividendYield",
-            "raw",
-        )
+        return safeget(self.ticker_info, "quoteSummary", "result", 0, module)
 
-    def get_industry(self) -> str:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
+    def get_company_name(self) -> str:
+        return self.snapshot.quote_type.short_name
 
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "assetProfile",
-            "industry",
-        )
+    def get_industry(self) -> str:
+        return self.snapshot.asset_profile.industry
 
     def get_sector(self) -> str:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "assetProfile",
-            "sector",
-        )
+        return self.snapshot.asset_profile.sector
 
     def get_exchange_name(self) -> str:
-        return safeget(
-            self.ticker_info, "quoteSummary", "result", 0, "price", "exchange"
-        )
+        return self.snapshot.price.exchange
 
     def get_dividend_yield(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        div_yield = safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "dividendYield",
-            "raw",
-        )
+        div_yield = self.snapshot.summary_detail.dividend_yield
 
         return div_yield if div_yield is not None else 0
 
     def get_beta(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "defaultKeyStatistics",
-            "beta",
-            "raw",
-        )
+        return self.snapshot.key_statistics.beta
 
     def get_market_cap(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "marketCap",
-            "raw",
-        )
+        return self.snapshot.summary_detail.market_cap
 
     def get_pe_ratio(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "trailingPE",
-            "raw",
-        )
+        return self.snapshot.summary_detail.trailing_pe
 
     def get_profit_margin(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "defaultKeyStatistics",
-            "profitMargins",
-            "raw",
-        )
+        return self.snapshot.key_statistics.profit_margins
 
     def get_debt_to_equity(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        res = safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "financialData",
-            "debtToEquity",
-            "raw",
-        )
+        res = self.snapshot.financial_data.debt_to_equity
         return res / 100 if res is not None else None
 
     def get_eps_ratio(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "defaultKeyStatistics",
-            "trailingEps",
-            "raw",
-        )
+        return self.snapshot.key_statistics.trailing_eps
 
     def get_current_price(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        price = safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "price",
-            "regularMarketPrice",
-            "raw",
-        )
+        price = self.snapshot.price.regular_market_price
 
         # Price for London stock exchange is calculated in penny
         return price / 100 if self.get_exchange_name() == "LSE" else price
 
     def get_currency(self) -> str:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "currency",
-        )
+        return self.snapshot.summary_detail.currency
 
     def get_yearly_ratios(self) -> list:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
+        self.load_modules("cashflowStatementHistory")
 
         statements = safeget(
             self.ticker_info,
@@ -233,62 +113,30 @@ class Ticker:
         ]
 
     def current_year_div_per_share(self) -> float:
-        yearly_dividends = self.get_dividends_per_year()
-        dividend_growth = self.get_yearly_dividend_growth(5)
-        last_year_div_amount = list(yearly_dividends.values())[-1]
-
-        return last_year_div_amount + (last_year_div_amount * dividend_growth)
-
-    def get_dividends_per_year(self) -> Dict[int, float]:
-        if self.historic_dividends is None:
-            self.historic_dividends = self.yf.get_historic_dividends(self.symbol)
+        return self.get_dividend_series().projected_amount(5)
 
-        current_year = datetime.now().year
-        dividends = {}
-        for d in self.historic_dividends:
-            dt = datetime.fromtimestamp(d["date"])
-            if dt.year == current_year:
-                continue
+    def get_dividend_series(self) -> DividendSeries:
+        if self.dividend_series is None:
+            if self.historic_dividends is None:
+                self.historic_dividends = self.yf.get_historic_dividends(self.symbol)
 
-            if dt.year not in dividends:
-                dividends[dt.year] = 0
+            self.dividend_series = DividendSeries(self.historic_dividends)
 
-            dividends[dt.year] += d["amount"]
+        return self.dividend_series
 
-        return dividends
+    def get_dividends_per_year(self) -> Dict[int, float]:
+        return self.get_dividend_series().yearly()
 
     def get_yearly_dividend_growth(self, last_years: int = None) -> float:
-        dividends = list(self.get_dividends_per_year().values())
-
-        if last_years is not None:
-            dividends = dividends[-last_years:]
-            initial = None
-            total_growth = 0
-
-        for i, div in enumerate(dividends):
-            if i == 0:
-                initial = div
-                continue
+        return self.get_dividend_series().growth(last_years)
 
-            total_growth += calc_percentage_diff(initial, div)
+    def get_indicators(self, interval: str = "1d") -> IndicatorEngine:
+        columns = self.yf.get_price_columns(self.symbol, interval)
 
-            initial = div
-
-        return round(total_growth / len(dividends), 4)
+        return get_indicator_engine(self.symbol, interval, columns)
 
     def get_trailing_average_div_yield(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        trailing_div_yield = safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "summaryDetail",
-            "fiveYearAvgDividendYield",
-            "raw",
-        )
+        trailing_div_yield = self.snapshot.summary_detail.five_year_avg_dividend_yield
 
         if trailing_div_yield is None:
             return 0
@@ -296,62 +144,18 @@ class Ticker:
         return float(trailing_div_yield) / 100
 
     def get_cadi(self) -> int:
-        divs = list(self.get_dividends_per_year().values())
-        divs.reverse()
-        cadi = 0
-
-        for i in range(len(divs)):
-            cadi += 1
-
-            if i + 1 == len(divs):
-                break
-
-            if divs[i] < divs[i + 1]:
-                break
-
-        return cadi
+        return self.get_dividend_series().cadi()
 
     def get_peg_ratio(self) -> float:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "defaultKeyStatistics",
-            "pegRatio",
-            "raw",
-        )
+        return self.snapshot.key_statistics.peg_ratio
 
     def get_ex_dividend_date(self, fmt: bool = False) -> int:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "calendarEvents",
-            "exDividendDate",
-            "fmt" if fmt else "raw",
-        )
+        events = self.snapshot.calendar_events
+        return events.ex_dividend_date_fmt if fmt else events.ex_dividend_date
 
     def get_next_dividend_date(self, fmt: bool = False) -> int:
-        if self.ticker_info is None:
-            self.ticker_info = self.yf.get_ticker_info(self.symbol)
-
-        return safeget(
-            self.ticker_info,
-            "quoteSummary",
-            "result",
-            0,
-            "calendarEvents",
-            "dividendDate",
-            "fmt" if fmt else "raw",
-        )
+        events = self.snapshot.calendar_events
+        return events.dividend_date_fmt if fmt else events.dividend_date
 
     def dividend_discount_model(self, ror: float = 0.1) -> float:
         current_dividend = self.get_dividend_yield() * self.get_current_price() / 100
@@ -0,0 +1,212 @@
+from typing import Any, Dict, Iterable, List
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+import pickle
+import threading
+
+from src.cache import atomic_write
+
+
+UNIVERSE_VERSION = 1
+
+# Listings scraped for the constituents of an index: (currency, Yahoo suffix
+# of the home exchange). Every listing on the home exchange is kept, as a
+# company's data often only holds the current ticker next to obsolete ones
+INDEX_LISTINGS = {
+    "AEX": ("EUR", ".AS"),
+    "BEL 20": ("EUR", ".BR"),
+    "CAC 40": ("EUR", ".PA"),
+    "CAC Mid 60": ("EUR", ".PA"),
+    "CDAX": ("EUR", ".DE"),
+    "DAX": ("EUR", ".DE"),
+    "DOW JONES": ("USD", None),
+    "EURO STOXX 50": ("EUR", None),
+    "FTSE 100": ("GBP", ".L"),
+    "IBEX 35": ("EUR", ".MC"),
+    "MDAX": ("EUR", ".DE"),
+    "MOEX": ("RUB", ".ME"),
+    "NASDAQ 100": ("USD", None),
+    "OMX Helsinki 25": ("EUR", ".HE"),
+    "OMX Stockholm 30": ("SEK", ".ST"),
+    "S&P 100": ("USD", None),
+    "S&P 500": ("USD", None),
+    "S&P 600": ("USD", None),
+    "SDAX": ("EUR", ".DE"),
+    "Switzerland 20": ("CHF", ".SW"),
+    "TECDAX": ("EUR", ".DE"),
+}
+
+
+def source_version() -> str:
+    try:
+        return version("pytickersymbols")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def pick_listings(stock: dict, currency: str, suffix: str | None) -> List[dict]:
+    # US constituents are quoted on Yahoo under their own symbol
+    if currency == "USD" and stock.get("symbol"):
+        return [{"yahoo": stock["symbol"], "currency": "USD"}]
+
+    # Never a listing in another currency, a US ticker is not in a UK index
+    listings = [
+        s
+        for s in stock.get("symbols") or []
+        if s.get("yahoo") and s.get("currency") == currency
+    ]
+
+    home = [s for s in listings if suffix is None or s["yahoo"].endswith(suffix)]
+
+    return home if len(home) > 0 else listings
+
+
+class Universe:
+    """
+    Constituents of every index shipped with pytickersymbols, walked once into
+    lookup maps and persisted in `cache_folder`. A warm start only unpickles
+    the maps, the source data is read again when its package version changes.
+
+    - indices: index -> Yahoo symbols of its constituents
+    - listings: Yahoo symbol -> symbol, name, currency and indices
+    - yahoo: symbol -> Yahoo symbols it is listed under
+    """
+
+    def __init__(
+        self, cache_folder: str = "./cache", universe_file: str = "universe.pkl"
+    ) -> None:
+        self.cache_folder = cache_folder
+        self.path = Path(cache_folder) / universe_file
+
+        self.indices: Dict[str, List[str]] = {}
+        self.listings: Dict[str, Dict[str, Any]] = {}
+        self.yahoo: Dict[str, List[str]] = {}
+
+        if not self.load():
+            self.build()
+            self.save()
+
+    def load(self) -> bool:
+        if not self.path.is_file():
+            return False
+
+        try:
+            with open(self.path, "rb") as file:
+                state = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+
+        if (
+            state.get("version") != UNIVERSE_VERSION
+            or state.get("source") != source_version()
+        ):
+            return False
+
+        self.indices = state["indices"]
+        self.listings = state["listings"]
+        self.yahoo = state["yahoo"]
+
+        return True
+
+    def save(self) -> None:
+        Path(self.cache_folder).mkdir(parents=True, exist_ok=True)
+
+        atomic_write(
+            self.path,
+            pickle.dumps(
+                {
+                    "version": UNIVERSE_VERSION,
+                    "source": source_version(),
+                    "indices": self.indices,
+                    "listings": self.listings,
+                    "yahoo": self.yahoo,
+                },
+                protocol=pickle.HIGHEST_PROTOCOL,
+            ),
+        )
+
+    def build(self) -> None:
+        from pytickersymbols import PyTickerSymbols
+
+        markets = PyTickerSymbols()
+
+        self.indices, self.listings, self.yahoo = {}, {}, {}
+        for index in sorted(markets.get_all_indices()):
+            currency, suffix = INDEX_LISTINGS.get(index, ("USD", None))
+
+            members: Dict[str, None] = {}
+            for stock in markets.get_stocks_by_index(index):
+                for listing in pick_listings(stock, currency, suffix):
+                    yahoo = listing["yahoo"]
+                    if yahoo in members:
+                        continue
+                    members[yahoo] = None
+
+                    info = self.listings.get(yahoo)
+                    if info is None:
+                        info = {
+                            "symbol": stock.get("symbol"),
+                            "name": stock.get("name"),
+                            "currency": listing.get("currency"),
+                            "indices": [],
+                        }
+                        self.listings[yahoo] = info
+
+                        symbols = self.yahoo.setdefault(info["symbol"] or yahoo, [])
+                        symbols.append(yahoo)
+
+                    info["indices"].append(index)
+
+            self.indices[index] = list(members)
+
+    def index_names(self) -> List[str]:
+        return list(self.indices.keys())
+
+    def symbols(self, indices: str | Iterable[str] = None) -> List[str]:
+        """
+        Yahoo symbols of the union of `indices`, all of them when None, in
+        index order without duplicates.
+        """
+        if indices is None:
+            indices = self.index_names()
+        elif isinstance(indices, str):
+            indices = [indices]
+
+        unknown = [i for i in indices if i not in self.indices]
+        assert len(unknown) == 0, f"Unknown indices {', '.join(unknown)}."
+
+        return list(dict.fromkeys(s for i in indices for s in self.indices[i]))
+
+    def listing(self, yahoo_symbol: str) -> Dict[str, Any] | None:
+        return self.listings.get(yahoo_symbol)
+
+    def indices_of(self, symbol: str) -> List[str]:
+        yahoo = self.yahoo.get(symbol, [symbol])
+        found = [i for y in yahoo for i in self.listings.get(y, {}).get("indices", [])]
+
+        return list(dict.fromkeys(found))
+
+    def yahoo_symbol(self, symbol: str, index: str = None) -> str | None:
+        for yahoo in self.yahoo.get(symbol, []):
+            if index is None or index in self.listings[yahoo]["indices"]:
+                return yahoo
+
+        return None
+
+    def currency(self, yahoo_symbol: str) -> str | None:
+        info = self.listings.get(yahoo_symbol)
+        return None if info is None else info["currency"]
+
+
+_universes: Dict[str, Universe] = {}
+_universes_lock = threading.Lock()
+
+
+def get_universe(cache_folder: str = "./cache") -> Universe:
+    with _universes_lock:
+        universe = _universes.get(cache_folder)
+        if universe is None:
+            universe = Universe(cache_folder)
+            _universes[cache_folder] = universe
+
+        return universe
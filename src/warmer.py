@@ -0,0 +1,526 @@
+from typing import Any, Dict, List, Tuple
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+import heapq
+import json
+import os
+import pickle
+import socket
+import threading
+import time
+import uuid
+
+from src.cache import atomic_write
+from src.screener import DEFAULT_INDICES
+from src.universe import get_universe
+from src.yahoo_finance import (
+    read_ticker_entry,
+    CacheStores,
+    YahooFinance,
+    CACHE_TTL_SEC,
+    QUOTE_SUMMARY_MODULES,
+)
+
+
+# The API servers start the warmer with CACHE_WARMER=1, importing them does not
+WARMER_ENABLED = os.environ.get("CACHE_WARMER", "0") == "1"
+
+WARMER_INTERVAL_SEC = int(os.environ.get("WARMER_INTERVAL_SEC", 60))
+
+# Upstream requests the warmer may send per hour, on top of user traffic
+WARMER_BUDGET_PER_HOUR = int(os.environ.get("WARMER_BUDGET_PER_HOUR", 600))
+
+# Entries are refreshed this long before they expire
+WARMER_LEAD_SEC = int(os.environ.get("WARMER_LEAD_SEC", 60 * 60))
+
+WARMER_HOT_SYMBOLS = int(os.environ.get("WARMER_HOT_SYMBOLS", 200))
+
+# A failed refresh is not retried before this delay
+WARMER_RETRY_SEC = int(os.environ.get("WARMER_RETRY_SEC", 60 * 15))
+
+# UTC hours [start, end) when the rest of the universe is refreshed
+WARMER_OFF_PEAK_HOURS = tuple(
+    int(h) for h in os.environ.get("WARMER_OFF_PEAK_HOURS", "1-6").split("-")
+)
+
+# Comma separated indices whose constituents are refreshed off-peak
+WARMER_INDICES = [
+    i.strip()
+    for i in os.environ.get("WARMER_INDICES", ",".join(DEFAULT_INDICES)).split(",")
+    if i.strip()
+]
+
+# Backend entry naming the process allowed to warm
+WARMER_LEASE_KEY = "warmer_lease"
+
+# Prefix of the backend entries holding the hottest symbols of each process
+POPULARITY_KEY = "popularity_"
+
+POPULARITY_HALF_LIFE_SEC = 60 * 60 * 24
+
+# Data not requested for this long is no longer warmed for a symbol
+POPULARITY_FORGET_SEC = 60 * 60 * 24 * 7
+
+POPULARITY_MAX_SYMBOLS = 5000
+
+POPULARITY_VERSION = 1
+
+
+class Popularity:
+    """
+    Exponentially decayed request counts per symbol, with the data (quoteSummary
+    modules, dividends, price intervals) recently requested for it.
+    """
+
+    def __init__(self, half_life_sec: int = POPULARITY_HALF_LIFE_SEC) -> None:
+        self.half_life_sec = half_life_sec
+        self.scores: Dict[str, Tuple[float, float]] = {}
+        self.resources: Dict[str, Dict[Tuple[str, str], float]] = {}
+        self.lock = threading.Lock()
+
+    def decayed(self, symbol: str, now: float) -> float:
+        score, updated_at = self.scores.get(symbol, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life_sec)
+
+    def hit(self, symbol: str, resources: List[Tuple[str, str]]) -> None:
+        now = time.time()
+
+        with self.lock:
+            self.scores[symbol] = (self.decayed(symbol, now) + 1, now)
+
+            seen = self.resources.setdefault(symbol, {})
+            for resource in resources:
+                seen[resource] = now
+
+            if len(self.scores) > POPULARITY_MAX_SYMBOLS * 1.2:
+                self.trim(now)
+
+    def trim(self, now: float) -> None:
+        keep = sorted(self.scores, key=lambda s: -self.decayed(s, now))
+        for symbol in keep[POPULARITY_MAX_SYMBOLS:]:
+            del self.scores[symbol]
+            self.resources.pop(symbol, None)
+
+    def hottest(self, limit: int) -> List[Tuple[str, float, List[Tuple[str, str]]]]:
+        """
+        The `limit` most requested symbols as (symbol, score, resources).
+        """
+        now = time.time()
+
+        with self.lock:
+            scores = [(s, self.decayed(s, now)) for s in self.scores]
+            hot = heapq.nlargest(limit, scores, key=lambda s: s[1])
+
+            return [(s, score, self.recent(s, now)) for s, score in hot]
+
+    def recent(self, symbol: str, now: float) -> List[Tuple[str, str]]:
+        seen = self.resources.get(symbol, {})
+        return [
+            r for r, seen_at in seen.items() if now - seen_at < POPULARITY_FORGET_SEC
+        ]
+
+    def state(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "version": POPULARITY_VERSION,
+                "scores": dict(self.scores),
+                "resources": {s: dict(r) for s, r in self.resources.items()},
+            }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        if state.get("version") != POPULARITY_VERSION:
+            return
+
+        with self.lock:
+            self.scores = state["scores"]
+            self.resources = state["resources"]
+
+
+class RequestBudget:
+    """
+    At most `per_hour` requests over any sliding hour. Unlike the rate
+    limiter it never waits, a refresh over budget is left for a later cycle.
+    """
+
+    def __init__(self, per_hour: int) -> None:
+        self.per_hour = per_hour
+        self.sent = deque()
+
+    def remaining(self, now: float) -> int:
+        while len(self.sent) > 0 and now - self.sent[0] >= 60 * 60:
+            self.sent.popleft()
+
+        return self.per_hour - len(self.sent)
+
+    def take(self, now: float, count: int = 1) -> bool:
+        if self.remaining(now) < count:
+            return False
+
+        self.sent.extend([now] * count)
+
+        return True
+
+
+def resources_of(
+    modules: List[str] = (), dividends: bool = False, interval: str = None
+) -> List[Tuple[str, str]]:
+    # Same arguments as cache_times, so route dependencies can be recorded
+    resources = [("module", m) for m in modules]
+    if dividends:
+        resources.append(("dividends", ""))
+    if interval is not None:
+        resources.append(("prices", interval))
+
+    return resources
+
+
+class FetchedIndex:
+    """
+    Fetch time of the quoteSummary modules of every cached symbol. One scan
+    of the backend lists the creation time of the entries, only entries
+    written since the last scan are read again.
+    """
+
+    def __init__(self, stores: CacheStores) -> None:
+        self.stores = stores
+        self.created: Dict[str, int] = {}
+        self.fetched: Dict[str, Tuple[int, Dict[str, float]]] = {}
+
+    def refresh(self) -> None:
+        created = {}
+        for key, created_at in self.stores.tickers.backend.scan("ticker_").items():
+            symbol = Path(key).stem[len("ticker_") :]
+            created[symbol] = max(created.get(symbol, 0), created_at)
+
+        self.created = created
+        self.fetched = {s: f for s, f in self.fetched.items() if created.get(s) == f[0]}
+
+    def get(self, symbol: str) -> Dict[str, float]:
+        created_at = self.created.get(symbol)
+        if created_at is None:
+            return {}
+
+        cached = self.fetched.get(symbol)
+        if cached is None or cached[0] != created_at:
+            entry = read_ticker_entry(symbol, self.stores)
+            cached = (created_at, {} if entry is None else entry["fetchedAt"])
+            self.fetched[symbol] = cached
+
+        return cached[1]
+
+
+class WarmerLease:
+    """
+    Lease on warming held in the cache backend, so one process of all those
+    sharing it warms. Its holder renews it every cycle, others take it over
+    once it expires. Two processes taking an expired lease at once may both
+    warm for a cycle, after which the last one written keeps it.
+    """
+
+    def __init__(self, backend, ttl_sec: int, key: str = WARMER_LEASE_KEY) -> None:
+        self.backend = backend
+        self.ttl_sec = ttl_sec
+        self.key = key
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self.renewed_at = 0.0
+
+    def acquire(self) -> bool:
+        owner = self.owner.encode("utf-8")
+
+        stored = self.backend.get(self.key)
+        if (
+            stored is not None
+            and stored[0] != owner
+            and time.time() < stored[1] + self.ttl_sec
+        ):
+            return False
+
+        self.backend.set(self.key, owner, self.ttl_sec)
+
+        stored = self.backend.get(self.key)
+        if stored is None or stored[0] != owner:
+            return False
+
+        self.renewed_at = time.time()
+
+        return True
+
+    def keep(self) -> bool:
+        # Renewed once a third has run out, a long cycle would outlive it
+        if time.time() < self.renewed_at + self.ttl_sec / 3:
+            return True
+
+        return self.acquire()
+
+
+def in_off_peak(now: float, hours: Tuple[int, int] = WARMER_OFF_PEAK_HOURS) -> bool:
+    start, end = hours
+    hour = datetime.fromtimestamp(now, timezone.utc).hour
+
+    # The window may wrap around midnight
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+
+class CacheWarmer:
+    """
+    Refreshes cache entries before users hit them expired. Symbols are ranked
+    by how often the API serves them and their requested data is refreshed
+    `lead_sec` ahead of expiry, most popular first. Off-peak, the remaining
+    budget refreshes the quoteSummary of the constituents of `indices`,
+    oldest first, in place of a manual Screener.scrape.
+
+    Only the process holding the lease in the cache backend warms, so the
+    budget is shared by every process using the backend. Every process
+    publishes its most requested symbols to the backend, where the lease
+    holder ranks them together.
+    """
+
+    def __init__(
+        self,
+        cache_folder: str = "./cache",
+        budget_per_hour: int = WARMER_BUDGET_PER_HOUR,
+        lead_sec: int = WARMER_LEAD_SEC,
+        hot_symbols: int = WARMER_HOT_SYMBOLS,
+        interval_sec: int = WARMER_INTERVAL_SEC,
+        yahoo_finance: YahooFinance = None,
+        popularity_file: str = "popularity.pkl",
+        indices: List[str] = WARMER_INDICES,
+    ) -> None:
+        self.cache_folder = cache_folder
+        self.indices = indices
+        self.budget = RequestBudget(budget_per_hour)
+        self.lead_sec = lead_sec
+        self.hot_symbols = hot_symbols
+        self.interval_sec = interval_sec
+        self.yf = (
+            YahooFinance(serve_stale=False, cache_dir=cache_folder)
+            if yahoo_finance is None
+            else yahoo_finance
+        )
+        self.fetched = FetchedIndex(self.yf.stores)
+        self.backend = self.yf.stores.tickers.backend
+        self.lease = WarmerLease(self.backend, interval_sec * 3)
+
+        self.popularity = Popularity()
+        self.popularity_key = f"{POPULARITY_KEY}{uuid.uuid4().hex}"
+        self.popularity_path = Path(cache_folder) / popularity_file
+        self.retry_at: Dict[str, float] = {}
+
+        self.thread = None
+        self.stopped = threading.Event()
+
+        self.load()
+
+    def record(
+        self,
+        symbol: str,
+        modules: List[str] = (),
+        dividends: bool = False,
+        interval: str = None,
+    ) -> None:
+        self.popularity.hit(symbol, resources_of(modules, dividends, interval))
+
+    def load(self) -> None:
+        if not self.popularity_path.is_file():
+            return
+
+        try:
+            with open(self.popularity_path, "rb") as file:
+                self.popularity.restore(pickle.load(file))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+    def save(self) -> None:
+        Path(self.cache_folder).mkdir(parents=True, exist_ok=True)
+
+        atomic_write(
+            self.popularity_path,
+            pickle.dumps(self.popularity.state(), protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+    def fetched_at(self, symbol: str, resource: Tuple[str, str]) -> float:
+        kind, name = resource
+        if kind == "module":
+            return self.fetched.get(symbol).get(name, 0)
+
+        if kind == "dividends":
+            history = self.yf.stores.dividends.read(f"dividends_{symbol}")
+        else:
+            history = self.yf.stores.prices.read(f"prices_{symbol}_{name}")
+
+        return 0 if history is None else history["refreshedAt"]
+
+    def due(self, symbol: str, resources: List[Tuple[str, str]], now: float):
+        """
+        Resources of the symbol expiring within the lead time, with the
+        earliest expiry.
+        """
+        due, expires_at = [], None
+        for resource in resources:
+            expiry = self.fetched_at(symbol, resource) + CACHE_TTL_SEC
+            if expiry - now <= self.lead_sec:
+                due.append(resource)
+                expires_at = expiry if expires_at is None else min(expires_at, expiry)
+
+        return due, expires_at
+
+    def publish(self, now: float) -> None:
+        hot = self.popularity.hottest(self.hot_symbols * 2)
+        data = json.dumps({"at": now, "hot": hot}).encode("utf-8")
+
+        self.backend.set(self.popularity_key, data, self.interval_sec * 3)
+
+    def hottest(self, now: float) -> List[Tuple[str, float, List[Tuple[str, str]]]]:
+        """
+        The `hot_symbols` most requested symbols over every process publishing
+        its popularity, as (symbol, score, resources).
+        """
+        scores: Dict[str, float] = {}
+        resources: Dict[str, Dict[Tuple[str, str], None]] = {}
+
+        for key, created_at in self.backend.scan(POPULARITY_KEY).items():
+            # Entries of the file backend are not removed on expiry
+            if now >= created_at + self.interval_sec * 3:
+                self.backend.delete(key)
+                continue
+
+            stored = self.backend.get(key)
+            try:
+                published = json.loads(stored[0])
+            except (TypeError, ValueError):
+                continue
+
+            decay = 0.5 ** ((now - published["at"]) / self.popularity.half_life_sec)
+            for symbol, score, seen in published["hot"]:
+                scores[symbol] = scores.get(symbol, 0.0) + score * decay
+                resources.setdefault(symbol, {}).update((tuple(r), None) for r in seen)
+
+        hot = heapq.nlargest(self.hot_symbols, scores.items(), key=lambda s: s[1])
+
+        return [(symbol, score, list(resources[symbol])) for symbol, score in hot]
+
+    def plan(self, now: float) -> List[tuple]:
+        """
+        Priority queue of (priority, symbol, resources). Hot symbols come
+        first by popularity, then off-peak the constituents of `indices` by
+        expiry.
+        """
+        self.fetched.refresh()
+
+        queue = []
+        hot = set()
+
+        for symbol, score, resources in self.hottest(now):
+            hot.add(symbol)
+            if self.retry_at.get(symbol, 0) > now:
+                continue
+
+            due, expires_at = self.due(symbol, resources, now)
+            if len(due) > 0:
+                heapq.heappush(queue, ((0, -score, expires_at), symbol, due))
+
+        if in_off_peak(now) and self.budget.remaining(now) > 0:
+            resources = resources_of(QUOTE_SUMMARY_MODULES)
+            for symbol in get_universe(self.cache_folder).symbols(self.indices):
+                if symbol in hot or self.retry_at.get(symbol, 0) > now:
+                    continue
+
+                due, expires_at = self.due(symbol, resources, now)
+                if len(due) > 0:
+                    heapq.heappush(queue, ((1, expires_at, 0), symbol, due))
+
+        return queue
+
+    def refresh(self, symbol: str, resources: List[Tuple[str, str]]) -> int:
+        """
+        Refreshes the resources, returns the number of upstream requests.
+        """
+        max_age_sec = max(0, CACHE_TTL_SEC - self.lead_sec)
+        requests = 0
+
+        # Every module of a symbol is fetched in one request
+        modules = [name for kind, name in resources if kind == "module"]
+        if len(modules) > 0:
+            self.yf.refresh_ticker_modules(symbol, modules, max_age_sec)
+            requests += 1
+
+        for kind, name in resources:
+            if kind == "dividends":
+                self.yf.refresh_dividends(symbol, max_age_sec)
+                requests += 1
+            elif kind == "prices":
+                self.yf.refresh_prices(symbol, name, max_age_sec)
+                requests += 1
+
+        return requests
+
+    def requests_needed(self, resources: List[Tuple[str, str]]) -> int:
+        modules = any(kind == "module" for kind, _ in resources)
+        return int(modules) + sum(kind != "module" for kind, _ in resources)
+
+    def run_once(self) -> int:
+        """
+        One warming cycle, returns the number of symbols refreshed.
+        """
+        now = time.time()
+        self.publish(now)
+
+        if not self.lease.acquire():
+            return 0
+
+        queue = self.plan(now)
+
+        refreshed = 0
+        while len(queue) > 0:
+            _, symbol, resources = heapq.heappop(queue)
+
+            if not self.lease.keep():
+                break
+
+            if not self.budget.take(now, self.requests_needed(resources)):
+                break
+
+            try:
+                self.refresh(symbol, resources)
+                refreshed += 1
+            except Exception as err:
+                print(f"Warming {symbol} failed: {err}")
+                self.retry_at[symbol] = now + WARMER_RETRY_SEC
+
+            now = time.time()
+
+        self.retry_at = {s: t for s, t in self.retry_at.items() if t > now}
+        self.save()
+
+        return refreshed
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            try:
+                refreshed = self.run_once()
+                if refreshed > 0:
+                    print(f"Warmed {refreshed} symbols")
+            except Exception as err:
+                print(f"Cache warming cycle failed: {err}")
+
+            self.stopped.wait(self.interval_sec)
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="cache-warmer", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+cache_warmer = CacheWarmer()
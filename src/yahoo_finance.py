@@ -1,39 +1,347 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import requests as re
+from requests.adapters import HTTPAdapter
+import os
+import threading
 import time
 from datetime import datetime
+from urllib.parse import urlparse
+import numpy as np
+from src.cache import refresher, single_flight, CacheStore, MISSING
+from src.fetcher import get_rate_limiter
+from src.history import HistoryStore
+from src.price_store import PriceStore, to_rows
 from src.utils import (
-    cache_factory,
     safeget,
     to_GBP,
 )
 
 
+QUERY1_URL = "https://query1.finance.yahoo.com"
+QUERY2_URL = "https://query2.finance.yahoo.com"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64)"
+
+POOL_SIZE = int(os.environ.get("YAHOO_POOL_SIZE", 32))
+
+CACHE_TTL_SEC = 60 * 60 * 24
+
+# How long past its TTL an entry is still served while it is refreshed
+CACHE_STALE_TTL_SEC = int(os.environ.get("CACHE_STALE_TTL_SEC", 60 * 60 * 24 * 2))
+
+QUOTE_SUMMARY_MODULES = [
+    "assetProfile",
+    "balanceSheetHistory",
+    "balanceSheetHistoryQuarterly",
+    "calendarEvents",
+    "cashflowStatementHistory",
+    "cashflowStatementHistoryQuarterly",
+    "defaultKeyStatistics",
+    "earnings",
+    "earningsHistory",
+    "earningsTrend",
+    "financialData",
+    "fundOwnership",
+    "incomeStatementHistory",
+    "incomeStatementHistoryQuarterly",
+    "indexTrend",
+    "industryTrend",
+    "insiderHolders",
+    "insiderTransactions",
+    "institutionOwnership",
+    "majorDirectHolders",
+    "majorHoldersBreakdown",
+    "netSharePurchaseActivity",
+    "price",
+    "quoteType",
+    "recommendationTrend",
+    "secFilings",
+    "sectorTrend",
+    "summaryDetail",
+    "summaryProfile",
+    "symbol",
+    "upgradeDowngradeHistory",
+    "fundProfile",
+    "topHoldings",
+    "fundPerformance",
+]
+
+CACHE_DIR = "./cache"
+
+
+class CacheStores:
+    """
+    The caches YahooFinance reads and fills, all kept under `cache_dir`.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        self.cache_dir = cache_dir
+
+        # quoteSummary modules are cached per symbol, with a fetch time per module
+        self.tickers = CacheStore(cache_dir, CACHE_TTL_SEC + CACHE_STALE_TTL_SEC)
+        self.dividends = HistoryStore(
+            cache_dir, CACHE_TTL_SEC, CACHE_STALE_TTL_SEC, key="date"
+        )
+        self.prices = PriceStore(cache_dir, CACHE_TTL_SEC, CACHE_STALE_TTL_SEC)
+
+
+_stores: Dict[str, CacheStores] = {}
+_stores_lock = threading.Lock()
+
+
+def get_stores(cache_dir: str = CACHE_DIR) -> CacheStores:
+    with _stores_lock:
+        stores = _stores.get(cache_dir)
+        if stores is None:
+            stores = CacheStores(cache_dir)
+            _stores[cache_dir] = stores
+
+        return stores
+
+
+default_stores = get_stores()
+
+ticker_store = default_stores.tickers
+
+dividend_history = default_stores.dividends
+
+price_history = default_stores.prices
+
+TIMEOUT = (
+    float(os.environ.get("YAHOO_CONNECT_TIMEOUT", 5)),
+    float(os.environ.get("YAHOO_READ_TIMEOUT", 30)),
+)
+
+
+def create_session(pool_size: int = POOL_SIZE) -> re.Session:
+    session = re.Session()
+
+    # One pool per Yahoo host, each able to keep `pool_size` connections alive
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    session.headers.update(
+        {
+            "user-agent": USER_AGENT,
+            "accept-encoding": "gzip, deflate",
+            "connection": "keep-alive",
+        }
+    )
+
+    return session
+
+
+_shared_session: re.Session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session() -> re.Session:
+    global _shared_session
+
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+
+        return _shared_session
+
+
+def read_ticker_entry(symbol: str, stores: CacheStores = default_stores) -> dict | None:
+    cached = stores.tickers.read(f"ticker_{symbol}")
+    if cached is MISSING:
+        return None
+
+    entry, created_at = cached
+    if "fetchedAt" not in entry:
+        # Entries written before modules were cached separately hold every
+        # module, all fetched when the entry was written
+        entry = {
+            **entry,
+            "fetchedAt": {m: created_at for m in QUOTE_SUMMARY_MODULES},
+        }
+
+    return entry
+
+
+def missing_modules(entry: dict, modules: List[str], max_age_sec: int) -> List[str]:
+    fetched_at = {} if entry is None else entry["fetchedAt"]
+    now = time.time()
+
+    return [m for m in modules if now >= fetched_at.get(m, 0) + max_age_sec]
+
+
+def write_ticker_modules(
+    symbol: str,
+    entry: dict | None,
+    result: dict,
+    modules: List[str],
+    stores: CacheStores = default_stores,
+) -> dict:
+    # Modules Yahoo has no data for are recorded too, so they are not
+    # requested again until they expire
+    fetched_at = int(time.time())
+    if entry is None:
+        entry = {"quoteSummary": {"result": [{}], "error": None}, "fetchedAt": {}}
+
+    entry = {
+        "quoteSummary": {
+            "result": [{**entry["quoteSummary"]["result"][0], **result}],
+            "error": None,
+        },
+        "fetchedAt": {**entry["fetchedAt"], **{m: fetched_at for m in modules}},
+    }
+    stores.tickers.write(f"ticker_{symbol}", entry)
+
+    return entry
+
+
+def cache_times(
+    symbol: str,
+    modules: List[str] = (),
+    dividends: bool = False,
+    interval: str = None,
+    stores: CacheStores = default_stores,
+) -> List[int] | None:
+    """
+    Fetch times of the cache entries holding the given data, None when any of
+    them is not cached.
+    """
+    times = []
+
+    if len(modules) > 0:
+        entry = read_ticker_entry(symbol, stores)
+        if entry is None:
+            return None
+
+        times += [entry["fetchedAt"].get(m) for m in modules]
+
+    if dividends:
+        entry = stores.dividends.read(f"dividends_{symbol}")
+        times.append(None if entry is None else entry["refreshedAt"])
+
+    if interval is not None:
+        entry = stores.prices.read(f"prices_{symbol}_{interval}")
+        times.append(None if entry is None else entry["refreshedAt"])
+
+    return None if None in times else times
+
+
 class YahooFinance:
-    @cache_factory("./cache", "ticker", 60 * 60 * 24)
-    def get_ticker_info(self, symbol: str) -> dict:
-        res = re.get(
-            f"https://query2.finance.yahoo.com/v10/finance/quoteSummary/{symbol}?modules=assetProfile,balanceSheetHistory,balanceSheetHistoryQuarterly,calendarEvents,cashflowStatementHistory,cashflowStatementHistoryQuarterly,defaultKeyStatistics,earnings,earningsHistory,earningsTrend,financialData,fundOwnership,incomeStatementHistory,incomeStatementHistoryQuarterly,indexTrend,industryTrend,insiderHolders,insiderTransactions,institutionOwnership,majorDirectHolders,majorHoldersBreakdown,netSharePurchaseActivity,price,quoteType,recommendationTrend,secFilings,sectorTrend,summaryDetail,summaryProfile,symbol,upgradeDowngradeHistory,fundProfile,topHoldings,fundPerformance",
-            headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64)"},
+    def __init__(
+        self,
+        rate_limit: float = None,
+        session: re.Session = None,
+        timeout: Tuple[float, float] = TIMEOUT,
+        query1_url: str = QUERY1_URL,
+        query2_url: str = QUERY2_URL,
+        serve_stale: bool = True,
+        cache_dir: str = CACHE_DIR,
+    ) -> None:
+        # Upstream requests per second allowed against each Yahoo host
+        self.rate_limit = rate_limit
+        self.stores = get_stores(cache_dir)
+        self.serve_stale = serve_stale
+        self.session = get_shared_session() if session is None else session
+        self.timeout = timeout
+        self.query1_url = query1_url
+        self.query2_url = query2_url
+
+    def _get(self, url: str) -> re.Response:
+        if self.rate_limit is not None:
+            get_rate_limiter(urlparse(url).netloc, self.rate_limit).acquire()
+
+        return self.session.get(url, timeout=self.timeout)
+
+    def _modules_url(self, symbol: str, modules: List[str]) -> str:
+        url = "{host}/v10/finance/quoteSummary/{symbol}?modules={modules}"
+        return url.format(
+            host=self.query2_url, symbol=symbol, modules=",".join(modules)
         )
 
+    def _parse_modules(self, res: re.Response) -> dict:
         assert res.status_code == 200, f"Status code is {res.status_code}"
 
-        return res.json()
+        result = safeget(res.json(), "quoteSummary", "result", 0)
+        assert result is not None, "Body of the response is null"
+
+        return result
+
+    def _fetch_modules(self, symbol: str, modules: List[str]) -> dict:
+        return self._parse_modules(self._get(self._modules_url(symbol, modules)))
+
+    def _refresh_modules(
+        self, symbol: str, modules: List[str], max_age_sec: int = CACHE_TTL_SEC
+    ) -> dict:
+        entry = read_ticker_entry(symbol, self.stores)
+        missing = missing_modules(entry, modules, max_age_sec)
+        if len(missing) == 0:
+            return entry
+
+        print(f"Fetching {', '.join(missing)} for {symbol} from source")
+        result = self._fetch_modules(symbol, missing)
+
+        return write_ticker_modules(symbol, entry, result, missing, self.stores)
+
+    def refresh_ticker_modules(
+        self, symbol: str, modules: List[str], max_age_sec: int = CACHE_TTL_SEC
+    ) -> dict:
+        """
+        Fetches the modules fetched more than `max_age_sec` ago, a max age
+        below the TTL refreshes them ahead of expiry.
+        """
+        return single_flight.do(
+            self.stores.tickers.key(f"ticker_{symbol}"),
+            lambda: self._refresh_modules(symbol, modules, max_age_sec),
+        )
+
+    def get_ticker_modules(self, symbol: str, modules: List[str]) -> dict:
+        name = f"ticker_{symbol}"
+        cache_key = self.stores.tickers.key(name)
+
+        def fetch() -> dict:
+            return self._refresh_modules(symbol, modules)
+
+        entry = read_ticker_entry(symbol, self.stores)
+        if len(missing_modules(entry, modules, CACHE_TTL_SEC)) == 0:
+            return entry
+
+        if (
+            self.serve_stale
+            and len(missing_modules(entry, modules, self.stores.tickers.max_age_sec))
+            == 0
+        ):
+            refresher.schedule(
+                f"{cache_key}:{','.join(modules)}",
+                lambda: single_flight.do(cache_key, fetch),
+            )
+            return entry
+
+        # Waiters share the leader's fetch, which may have covered other modules
+        while len(missing_modules(entry, modules, CACHE_TTL_SEC)) > 0:
+            entry = single_flight.do(cache_key, fetch)
+
+        return entry
 
-    @cache_factory("./cache", "dividends", 60 * 60 * 24)
-    def get_historic_dividends(self, symbol: str) -> dict:
-        url = "https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?period1=0&period2={timestamp}&interval={interval}&events=div"
-        res = re.get(
-            url.format(symbol=symbol, timestamp=int(time.time()), interval="1mo"),
-            headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64)"},
+    def get_ticker_info(self, symbol: str) -> dict:
+        return self.get_ticker_modules(symbol, QUOTE_SUMMARY_MODULES)
+
+    def _dividends_url(self, symbol: str, since: int = None) -> str:
+        url = "{host}/v8/finance/chart/{symbol}?period1={period1}&period2={timestamp}&interval={interval}&events=div"
+        return url.format(
+            host=self.query1_url,
+            symbol=symbol,
+            period1=0 if since is None else since,
+            timestamp=int(time.time()),
+            interval="1mo",
         )
 
+    def _parse_dividends(self, res: re.Response) -> List[dict]:
         assert res.status_code == 200, f"Status code is {res.status_code}"
 
         body = res.json()
         raw = safeget(body, "chart", "result", 0, "events", "dividends")
-        assert raw is not None, f"Company {symbol} is not paying dividends"
+        if raw is None:
+            return []
 
         def format_dividend(div: dict) -> dict:
             currency = safeget(body, "chart", "result", 0, "meta", "currency")
@@ -47,21 +355,53 @@ class YahooFinance:
 
         return [format_dividend(div) for div in list(raw.values())]
 
-    @cache_factory("./cache", "prices", ttl_sec=60 * 60 * 24)
-    def get_historic_prices(self, symbol: str, interval: str = "1mo") -> dict:
-        url = "https://query2.finance.yahoo.com/v8/finance/chart/{symbol}?range={range}&interval={interval}"
-        res = re.get(
-            url.format(symbol=symbol, range="max", interval=interval),
-            headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64)"},
+    def _fetch_dividends(self, symbol: str, since: int = None) -> List[dict]:
+        return self._parse_dividends(self._get(self._dividends_url(symbol, since)))
+
+    def get_historic_dividends(self, symbol: str) -> List[dict]:
+        dividends = self.stores.dividends.get(
+            f"dividends_{symbol}",
+            lambda since: self._fetch_dividends(symbol, since),
+            self.serve_stale,
         )
+        assert len(dividends) > 0, f"Company {symbol} is not paying dividends"
 
+        return dividends
+
+    def peek_historic_dividends(self, symbol: str) -> List[dict] | None:
+        return self.stores.dividends.peek(f"dividends_{symbol}")
+
+    def refresh_dividends(self, symbol: str, max_age_sec: int = CACHE_TTL_SEC) -> dict:
+        name = f"dividends_{symbol}"
+        return single_flight.do(
+            self.stores.dividends.cache_key(name),
+            lambda: self.stores.dividends.refresh(
+                name, lambda since: self._fetch_dividends(symbol, since), max_age_sec
+            ),
+        )
+
+    def _prices_url(self, symbol: str, interval: str, since: int = None) -> str:
+        if since is None:
+            url = "{host}/v8/finance/chart/{symbol}?range=max&interval={interval}"
+        else:
+            url = "{host}/v8/finance/chart/{symbol}?period1={period1}&period2={timestamp}&interval={interval}"
+
+        return url.format(
+            host=self.query2_url,
+            symbol=symbol,
+            period1=since,
+            timestamp=int(time.time()),
+            interval=interval,
+        )
+
+    def _parse_prices(self, res: re.Response) -> List[dict]:
         assert res.status_code == 200, f"Status code is {res.status_code}"
 
         body = safeget(res.json(), "chart", "result", 0)
         assert body is not None, "Body of the response is null"
 
         prices = []
-        for i, t in enumerate(body["timestamp"]):
+        for i, t in enumerate(body.get("timestamp", [])):
             prices.append(
                 {
                     "timestamp": t,
@@ -76,13 +416,48 @@ class YahooFinance:
 
         return prices
 
-    def search_ticker(self, query: str) -> List[Dict[str, Any]]:
-        url = "https://query1.finance.yahoo.com/v1/finance/search?q={query}"
-        res = re.get(
-            url.format(query=query),
-            headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64)"},
+    def _fetch_prices(
+        self, symbol: str, interval: str, since: int = None
+    ) -> List[dict]:
+        return self._parse_prices(self._get(self._prices_url(symbol, interval, since)))
+
+    def get_price_columns(
+        self, symbol: str, interval: str = "1mo"
+    ) -> Dict[str, np.ndarray]:
+        bars = self.stores.prices.get(
+            f"prices_{symbol}_{interval}",
+            lambda since: self._fetch_prices(symbol, interval, since),
+            self.serve_stale,
+        )
+
+        return self.stores.prices.columns(bars)
+
+    def get_historic_prices(self, symbol: str, interval: str = "1mo") -> List[dict]:
+        bars = self.stores.prices.get(
+            f"prices_{symbol}_{interval}",
+            lambda since: self._fetch_prices(symbol, interval, since),
+            self.serve_stale,
         )
 
+        return to_rows(bars)
+
+    def refresh_prices(
+        self, symbol: str, interval: str = "1mo", max_age_sec: int = CACHE_TTL_SEC
+    ) -> dict:
+        name = f"prices_{symbol}_{interval}"
+        return single_flight.do(
+            self.stores.prices.cache_key(name),
+            lambda: self.stores.prices.refresh(
+                name,
+                lambda since: self._fetch_prices(symbol, interval, since),
+                max_age_sec,
+            ),
+        )
+
+    def search_ticker(self, query: str) -> List[Dict[str, Any]]:
+        url = "{host}/v1/finance/search?q={query}"
+        res = self._get(url.format(host=self.query1_url, query=query))
+
         assert res.status_code == 200, f"Status code is {res.status_code}"
 
         body = safeget(res.json(), "quotes")
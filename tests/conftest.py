@@ -0,0 +1,121 @@
+from typing import List
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import json
+import threading
+import time
+import pytest
+
+
+MODULES = {
+    "quoteType": {"shortName": "Stub Inc"},
+    "assetProfile": {"sector": "Technology", "industry": "Software"},
+    "summaryDetail": {"dividendYield": {"raw": 0.02}, "trailingPE": {"raw": 20.0}},
+    "defaultKeyStatistics": {"pegRatio": {"raw": 1.5}, "trailingPE": {"raw": 20.0}},
+    "price": {"regularMarketPrice": {"raw": 150.0}},
+}
+
+
+class StubYahoo(BaseHTTPRequestHandler):
+    """
+    Answers quoteSummary and chart requests with fixed payloads, recording
+    every requested path. Symbols starting with MISSING are not found.
+    """
+
+    requests: List[str] = []
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        args = parse_qs(url.query)
+        self.requests.append(self.path)
+
+        if "/MISSING" in url.path:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        if "quoteSummary" in url.path:
+            symbol = url.path.rsplit("/", 1)[1]
+            modules = args["modules"][0].split(",")
+            result = {m: MODULES[m] for m in modules if m in MODULES}
+            if "quoteType" in result:
+                result["quoteType"] = {**result["quoteType"], "symbol": symbol}
+
+            body = {"quoteSummary": {"result": [result], "error": None}}
+        else:
+            timestamps = [1600000000 + 86400 * i for i in range(30)]
+            closes = [100.0 + i for i in range(30)]
+            body = {
+                "chart": {
+                    "result": [
+                        {
+                            "meta": {"currency": "USD"},
+                            "timestamp": timestamps,
+                            "indicators": {
+                                "quote": [
+                                    {
+                                        "open": closes,
+                                        "close": closes,
+                                        "high": closes,
+                                        "low": closes,
+                                        "volume": [1000] * 30,
+                                    }
+                                ]
+                            },
+                        }
+                    ]
+                }
+            }
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_yahoo():
+    StubYahoo.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubYahoo)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield f"http://127.0.0.1:{server.server_port}", StubYahoo.requests
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def api_client(stub_yahoo, tmp_path, monkeypatch):
+    """
+    Flask test client of the API, fetching from the stub into a fresh
+    ./cache. Yields (client, requests_list).
+    """
+    from src.cache import memory_cache, refresher
+    from src.yahoo_finance import YahooFinance
+
+    url, requests = stub_yahoo
+    monkeypatch.chdir(tmp_path)
+    memory_cache.clear()
+
+    init = YahooFinance.__init__
+
+    def stub_init(self, *args, **kwargs):
+        kwargs.setdefault("query1_url", url)
+        kwargs.setdefault("query2_url", url)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(YahooFinance, "__init__", stub_init)
+
+    from api import app
+
+    yield app.test_client(), requests
+
+    # Background refreshes write relative to the working directory
+    while len(refresher.pending) > 0:
+        time.sleep(0.01)
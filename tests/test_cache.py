@@ -0,0 +1,108 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import time
+import pytest
+
+from src import cache
+from src.cache import (
+    BinarySerializer,
+    CacheStore,
+    LRUCache,
+    SingleFlight,
+    refresher,
+)
+from src.yahoo_finance import CACHE_TTL_SEC, CacheStores, YahooFinance
+
+
+def test_single_flight_shares_one_call():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return {"fetched": len(calls)}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "AAPL", fetch)
+        started.wait()
+        waiters = [executor.submit(flight.do, "AAPL", fetch) for _ in range(3)]
+
+        # Waiters are blocked on the leader's call, not running their own
+        time.sleep(0.05)
+        release.set()
+
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert flight.calls == {}
+
+
+def test_single_flight_raises_the_error_in_every_caller():
+    flight, started, release = SingleFlight(), threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait()
+        raise ValueError("Status code is 500")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(flight.do, "AAPL", fetch)
+        started.wait()
+        waiters = [executor.submit(flight.do, "AAPL", fetch) for _ in range(2)]
+        time.sleep(0.05)
+        release.set()
+
+        for future in [leader] + waiters:
+            with pytest.raises(ValueError, match="Status code is 500"):
+                future.result()
+
+    # The failed call is not cached, the next caller runs again
+    assert flight.do("AAPL", lambda: "retried") == "retried"
+
+
+def test_a_stale_entry_is_served_while_it_is_refreshed(
+    stub_yahoo, tmp_path, monkeypatch
+):
+    url, requests = stub_yahoo
+    monkeypatch.setattr(cache, "memory_cache", LRUCache(1 << 20))
+
+    stale = time.time() - CACHE_TTL_SEC - 60
+    entry = {
+        "quoteSummary": {"result": [{"assetProfile": {"sector": "Old"}}]},
+        "fetchedAt": {"assetProfile": stale},
+    }
+    CacheStores(str(tmp_path)).tickers.write("ticker_AAPL", entry)
+
+    yf = YahooFinance(query1_url=url, query2_url=url, cache_dir=str(tmp_path))
+    served = yf.get_ticker_modules("AAPL", ["assetProfile"])
+    assert served["fetchedAt"]["assetProfile"] == stale
+
+    while len(refresher.pending) > 0:
+        time.sleep(0.01)
+
+    assert len(requests) == 1
+    fresh = yf.get_ticker_modules("AAPL", ["assetProfile"])
+    assert fresh["fetchedAt"]["assetProfile"] > stale
+    assert len(requests) == 1
+
+
+def test_json_entries_migrate_keeping_their_mtime(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "memory_cache", LRUCache(1 << 20))
+
+    legacy = tmp_path / "ticker_AAPL.json"
+    legacy.write_text(json.dumps({"fetchedAt": {"price": 1}}))
+    written_at = int(time.time()) - 600
+    os.utime(legacy, (written_at, written_at))
+
+    store = CacheStore(str(tmp_path), 60 * 60, serializer=BinarySerializer())
+    value, created_at = store.read("ticker_AAPL")
+
+    assert value == {"fetchedAt": {"price": 1}}
+    assert created_at == written_at
+    assert not legacy.exists()
+    assert int(os.stat(tmp_path / "ticker_AAPL.bin").st_mtime) == written_at
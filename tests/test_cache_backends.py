@@ -0,0 +1,87 @@
+import time
+import fakeredis
+import pytest
+
+from src import cache
+from src.cache import BinarySerializer, CacheStore, LRUCache, MISSING
+from src.cache_backends import RedisBackend, SQLiteBackend
+
+
+@pytest.fixture
+def backend():
+    return RedisBackend(namespace="test", client=fakeredis.FakeRedis())
+
+
+def test_redis_backend_get_set_scan_and_ttl(backend):
+    assert backend.get("ticker_AAPL.bin") is None
+
+    created_at = backend.set("ticker_AAPL.bin", b"aapl", 60)
+    backend.set("ticker_MSFT.bin", b"msft", 60)
+    backend.set("prices_AAPL_1mo.bin", b"prices", 60)
+
+    assert backend.get("ticker_AAPL.bin") == (b"aapl", created_at)
+    assert backend.scan("ticker_") == {
+        "ticker_AAPL.bin": created_at,
+        "ticker_MSFT.bin": created_at,
+    }
+    assert 0 < backend.client.ttl("test:ticker_AAPL.bin") <= 60
+
+    backend.delete("ticker_MSFT.bin")
+    assert backend.get("ticker_MSFT.bin") is None
+    assert list(backend.scan("ticker_")) == ["ticker_AAPL.bin"]
+
+
+def test_shared_backends_need_signed_entries(backend, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_SECRET", None)
+    with pytest.raises(AssertionError):
+        CacheStore("unused", 60, backend=backend)
+
+    monkeypatch.setattr(cache, "CACHE_SECRET", "secret")
+    store = CacheStore("unused", 60, backend=backend)
+    store.write("ticker_AAPL", {"price": 1})
+    cache.memory_cache.clear()
+
+    assert store.read("ticker_AAPL")[0] == {"price": 1}
+
+    # Entries pickled by anyone without the secret are never unpickled
+    for serializer in [BinarySerializer(), BinarySerializer(secret=b"guess")]:
+        backend.set(store.entry("ticker_AAPL"), serializer.dumps({"price": 2}), 60)
+        cache.memory_cache.clear()
+
+        assert store.read("ticker_AAPL") is MISSING
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "redis"])
+def test_a_worker_reads_entries_written_by_another(kind, tmp_path, monkeypatch):
+    if kind == "sqlite":
+        shared = SQLiteBackend(str(tmp_path / "cache.db"))
+    else:
+        shared = RedisBackend(client=fakeredis.FakeRedis())
+
+    monkeypatch.setattr(cache, "CACHE_SECRET", "secret")
+    writer = CacheStore("unused", 60 * 60, backend=shared)
+    reader = CacheStore("unused", 60 * 60, backend=shared)
+
+    # Each worker process has its own memory tier
+    def worker(memory: LRUCache) -> None:
+        monkeypatch.setattr(cache, "memory_cache", memory)
+
+    writer_memory, reader_memory = LRUCache(1 << 20), LRUCache(1 << 20)
+
+    worker(writer_memory)
+    writer.write("ticker_AAPL", {"price": 1})
+
+    worker(reader_memory)
+    assert reader.read("ticker_AAPL")[0] == {"price": 1}
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 5)
+
+    worker(writer_memory)
+    writer.write("ticker_AAPL", {"price": 2})
+
+    worker(reader_memory)
+    assert reader.read("ticker_AAPL")[0] == {"price": 2}
+
+    writer.delete("ticker_AAPL")
+    assert reader.read("ticker_AAPL") is MISSING
@@ -0,0 +1,78 @@
+from datetime import datetime
+import random
+import pytest
+
+from src.dividends import DividendSeries
+from src.utils import calc_percentage_diff
+
+
+def make_dividends(rng: random.Random):
+    year = datetime.now().year
+    dividends = []
+    for y in range(year - 12, year + 1):
+        for month in (1, 4, 7, 12):
+            # Boundary dates land on either side of the local new year
+            day = 31 if month == 12 else 1
+            date = datetime(y, month, day, 23 if month == 12 else 0, 30)
+            dividends.append(
+                {"date": int(date.timestamp()), "amount": round(rng.uniform(0.1, 1), 2)}
+            )
+
+    return dividends
+
+
+def baseline_per_year(dividends):
+    current_year = datetime.now().year
+    per_year = {}
+    for d in dividends:
+        dt = datetime.fromtimestamp(d["date"])
+        if dt.year == current_year:
+            continue
+
+        per_year[dt.year] = per_year.get(dt.year, 0) + d["amount"]
+
+    return per_year
+
+
+def baseline_growth(dividends, last_years):
+    values = list(baseline_per_year(dividends).values())[-last_years:]
+    total_growth = 0
+    for initial, div in zip(values, values[1:]):
+        total_growth += calc_percentage_diff(initial, div)
+
+    return round(total_growth / len(values), 4)
+
+
+def baseline_cadi(dividends):
+    divs = list(baseline_per_year(dividends).values())
+    divs.reverse()
+    cadi = 0
+    for i in range(len(divs)):
+        cadi += 1
+        if i + 1 == len(divs) or divs[i] < divs[i + 1]:
+            break
+
+    return cadi
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_dividend_metrics_match_the_baseline(seed):
+    dividends = make_dividends(random.Random(seed))
+    series = DividendSeries(list(reversed(dividends)))
+
+    assert series.yearly() == pytest.approx(baseline_per_year(dividends))
+    for last_years in (1, 5, 10):
+        assert series.growth(last_years) == baseline_growth(dividends, last_years)
+    assert series.cadi() == baseline_cadi(dividends)
+
+    last = list(baseline_per_year(dividends).values())[-1]
+    expected = last + last * baseline_growth(dividends, 5)
+    assert series.projected_amount(5) == pytest.approx(expected)
+
+
+def test_an_empty_history_has_no_growth():
+    series = DividendSeries([])
+
+    assert series.yearly() == {}
+    assert series.growth(5) == 0.0
+    assert series.cadi() == 0
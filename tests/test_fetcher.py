@@ -0,0 +1,14 @@
+import pytest
+
+from src.fetcher import get_rate_limiter
+
+
+def test_clients_of_a_host_share_one_limiter():
+    limiter = get_rate_limiter("limited.example", 5)
+    assert get_rate_limiter("limited.example", 5) is limiter
+
+    with pytest.raises(AssertionError):
+        get_rate_limiter("limited.example", 10)
+
+    assert get_rate_limiter("limited.example", 5) is limiter
+    assert get_rate_limiter("other.example", 10) is not limiter
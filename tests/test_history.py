@@ -0,0 +1,39 @@
+import time
+
+from src import cache
+from src.cache import LRUCache
+from src.history import HistoryStore
+
+
+def dividend(date: int, amount: float) -> dict:
+    return {"date": date, "amount": amount}
+
+
+def test_refresh_fetches_from_the_overlap_and_merges(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "memory_cache", LRUCache(1 << 20))
+    store = HistoryStore(str(tmp_path), 60, 60, key="date")
+    fetched_since = []
+
+    def fetch(bars):
+        def fetch_since(since):
+            fetched_since.append(since)
+            return bars
+
+        return fetch_since
+
+    history = [dividend(100, 1.0), dividend(200, 1.1), dividend(300, 1.2)]
+    assert store.refresh("dividends_AAPL", fetch(history))["bars"] == history
+
+    # The last bar was revised and re-keyed, a new one was added
+    fetched = [dividend(200, 1.1), dividend(310, 1.25), dividend(400, 1.3)]
+    entry = store.refresh("dividends_AAPL", fetch(fetched), max_age_sec=0)
+
+    assert fetched_since == [None, 200]
+    assert entry["bars"] == [dividend(100, 1.0)] + fetched
+    assert store.peek("dividends_AAPL") == entry["bars"]
+
+    # Nothing new upstream keeps the stored history
+    entry = store.refresh("dividends_AAPL", fetch([]), max_age_sec=0)
+    assert fetched_since[-1] == 310
+    assert entry["bars"] == [dividend(100, 1.0)] + fetched
+    assert abs(entry["refreshedAt"] - time.time()) < 60
@@ -0,0 +1,45 @@
+import time
+
+from api.http_cache import Validators
+from src.yahoo_finance import default_stores, CACHE_TTL_SEC
+
+
+COMPANY = "/api/v1/ticker/AAPL/company"
+
+
+def test_conditional_requests_are_answered_with_304(api_client):
+    client, requests = api_client
+
+    res = client.get(COMPANY)
+    etag, last_modified = res.headers["ETag"], res.headers["Last-Modified"]
+
+    assert res.status_code == 200
+    assert res.json["data"]["company_name"] == "Stub Inc"
+    assert len(requests) == 1
+
+    res = client.get(COMPANY, headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+
+    res = client.get(COMPANY, headers={"If-Modified-Since": last_modified})
+    assert res.status_code == 304
+
+    res = client.get(COMPANY, headers={"If-None-Match": 'W/"other"'})
+    assert res.status_code == 200
+    assert len(requests) == 1
+
+
+def test_stale_entries_are_served_in_full(api_client):
+    client, _ = api_client
+    client.get(COMPANY)
+
+    entry, _ = default_stores.tickers.read("ticker_AAPL")
+    fetched_at = int(time.time()) - CACHE_TTL_SEC - 60
+    stale = {**entry, "fetchedAt": {m: fetched_at for m in entry["fetchedAt"]}}
+    default_stores.tickers.write("ticker_AAPL", stale)
+
+    etag = Validators(COMPANY, [fetched_at, fetched_at]).etag
+    res = client.get(COMPANY, headers={"If-None-Match": etag})
+
+    assert res.status_code == 200
+    assert res.json["data"]["company_name"] == "Stub Inc"
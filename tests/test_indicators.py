@@ -0,0 +1,101 @@
+import numpy as np
+
+from src.indicators import IndicatorEngine
+
+
+def make_bars(timestamps, closes):
+    closes = np.asarray(closes, dtype=np.float64)
+    return {
+        "timestamp": np.asarray(timestamps, dtype=np.float64),
+        "open": closes - 1,
+        "high": closes + 2,
+        "low": closes - 2,
+        "close": closes,
+        "volume": np.full(closes.size, 1000.0),
+    }
+
+
+def assert_same_engine(engine, expected):
+    assert len(engine) == len(expected)
+    for name in engine.columns:
+        np.testing.assert_allclose(engine[name], expected[name], equal_nan=True)
+
+
+def test_update_appends_new_bars():
+    closes = 100 + np.sin(np.arange(300) / 7) * 10
+    bars = make_bars(np.arange(300) * 100, closes)
+
+    engine = IndicatorEngine()
+    engine.update({k: v[:250] for k, v in bars.items()})
+    engine.update(bars)
+
+    expected = IndicatorEngine()
+    expected.update(bars)
+
+    assert_same_engine(engine, expected)
+
+
+def test_update_drops_a_re_keyed_provisional_bar():
+    engine = IndicatorEngine()
+    engine.update(make_bars([100, 200, 350], [10, 11, 12]))
+
+    # The open period keyed at 350 closed and is now keyed at 300
+    bars = make_bars([100, 200, 300, 400], [10, 11, 12.5, 13])
+    engine.update(bars)
+
+    expected = IndicatorEngine()
+    expected.update(bars)
+
+    assert engine["timestamp"].tolist() == [100, 200, 300, 400]
+    assert_same_engine(engine, expected)
+
+
+def test_update_recomputes_from_a_revised_close():
+    closes = np.arange(60, dtype=np.float64) + 100
+    engine = IndicatorEngine()
+    engine.update(make_bars(np.arange(60), closes))
+
+    revised = closes.copy()
+    revised[40] = 90
+    bars = make_bars(np.arange(61), np.append(revised, 160))
+    engine.update(bars)
+
+    expected = IndicatorEngine()
+    expected.update(bars)
+
+    assert_same_engine(engine, expected)
+
+
+def wilder_rsi(closes, period):
+    rsi = [None] * len(closes)
+    changes = [b - a for a, b in zip(closes, closes[1:])]
+    if len(changes) < period:
+        return rsi
+
+    avg_gain = sum(max(d, 0) for d in changes[:period]) / period
+    avg_loss = sum(max(-d, 0) for d in changes[:period]) / period
+    for i in range(period, len(closes)):
+        if i > period:
+            d = changes[i - 1]
+            avg_gain = (avg_gain * (period - 1) + max(d, 0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-d, 0)) / period
+        rsi[i] = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    return rsi
+
+
+def test_rsi_matches_wilder_reference():
+    closes = 100 + np.cumsum(np.random.default_rng(7).normal(0, 1, 120))
+    bars = make_bars(np.arange(120) * 100, closes)
+    expected = [np.nan if v is None else v for v in wilder_rsi(list(closes), 14)]
+
+    engine = IndicatorEngine()
+    engine.update(bars)
+    np.testing.assert_allclose(engine["rsi_14"], expected, equal_nan=True)
+
+    # Appending across the seeding bar continues the same series
+    for split in (5, 14, 15):
+        engine = IndicatorEngine()
+        engine.update({k: v[:split] for k, v in bars.items()})
+        engine.update(bars)
+        np.testing.assert_allclose(engine["rsi_14"], expected, equal_nan=True)
@@ -0,0 +1,30 @@
+FIELDS = ["dividend_yield", "current_price", "pe_ratio"]
+
+
+def test_batch_ratios_report_errors_per_symbol(api_client):
+    client, requests = api_client
+
+    res = client.post(
+        "/api/v1/tickers/ratios",
+        json={"symbols": ["AAPL", "MISSING", "AAPL"], "fields": FIELDS},
+    )
+    body = res.get_json()
+
+    assert res.status_code == 200
+    assert list(body["data"]) == ["AAPL"]
+    assert body["data"]["AAPL"]["current_price"] == 150.0
+    assert list(body["errors"]) == ["MISSING"]
+    assert "404" in body["errors"]["MISSING"]
+
+    # Only the modules the fields read are fetched
+    modules = {r.split("modules=")[1] for r in requests if "/AAPL" in r}
+    assert modules == {"price,summaryDetail"}
+
+
+def test_unknown_batch_fields_fail_the_request(api_client):
+    client, _ = api_client
+
+    res = client.get("/api/v1/tickers/ratios?symbols=AAPL&fields=dividend_yield,foo")
+
+    assert res.status_code == 500
+    assert res.get_json()["error"] == "Unknown fields foo."
@@ -0,0 +1,28 @@
+import json
+import time
+
+from src.price_store import PriceStore
+
+
+def test_read_migrates_an_interval_less_legacy_entry(tmp_path):
+    bars = [
+        {
+            "timestamp": t,
+            "open": 1.0,
+            "close": 2.0,
+            "high": 3.0,
+            "low": 0.5,
+            "volume": 10,
+        }
+        for t in [100, 200, 300]
+    ]
+    (tmp_path / "prices_AAPL.json").write_text(json.dumps(bars))
+
+    store = PriceStore(str(tmp_path), 60 * 60, 60 * 60 * 24)
+    entry = store.read("prices_AAPL_1mo")
+
+    assert entry["bars"][0].tolist() == [100, 200, 300]
+    assert entry["bars"][4].tolist() == [2.0, 2.0, 2.0]
+    assert abs(entry["refreshedAt"] - time.time()) < 60
+    assert not (tmp_path / "prices_AAPL.json").exists()
+    assert store.read("prices_AAPL_1d") is None
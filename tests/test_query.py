@@ -0,0 +1,95 @@
+import random
+import numpy as np
+from pandas import DataFrame
+
+from src.query import ColumnStats, execute
+
+
+SECTORS = ["Energy", "Technology", "Utilities", None]
+
+
+def make_frame(rng: random.Random, size: int) -> DataFrame:
+    def number():
+        return None if rng.random() < 0.2 else round(rng.uniform(0, 10), 1)
+
+    return DataFrame(
+        {
+            "pe": [number() for _ in range(size)],
+            "yield": [number() for _ in range(size)],
+            "sector": [rng.choice(SECTORS) for _ in range(size)],
+        }
+    ).astype({"pe": float, "yield": float})
+
+
+def make_query(rng: random.Random, depth: int = 0):
+    if depth < 3 and rng.random() < 0.5:
+        kind = rng.choice(["and", "or", "not"])
+        if kind == "not":
+            return ("not", make_query(rng, depth + 1))
+        return (kind, [make_query(rng, depth + 1) for _ in range(rng.randint(1, 3))])
+
+    if rng.random() < 0.3:
+        operator = rng.choice(["eq", "ne", "in", "not_in"])
+        value = rng.sample(SECTORS[:3], 2) if "in" in operator else SECTORS[0]
+        return ("sector", operator, value)
+
+    path = rng.choice(["pe", "yield"])
+    operator = rng.choice(["gt", "lt", "eq", "ne", "in", "not_in", "between"])
+    match operator:
+        case "in" | "not_in":
+            value = [round(rng.uniform(0, 10), 1) for _ in range(3)]
+        case "between":
+            value = sorted(round(rng.uniform(0, 10), 1) for _ in range(2))
+        case _:
+            value = round(rng.uniform(0, 10), 1)
+
+    return (path, operator, value)
+
+
+def matches(row: dict, query) -> bool:
+    match query[0]:
+        case "and":
+            return all(matches(row, q) for q in query[1])
+        case "or":
+            return any(matches(row, q) for q in query[1])
+        case "not":
+            return not matches(row, query[1])
+
+    path, operator, value = query
+    v = row[path]
+    if v is None or v != v:
+        return False
+
+    match operator:
+        case "gt":
+            return v > value
+        case "lt":
+            return v < value
+        case "eq":
+            return v == value
+        case "ne":
+            return v != value
+        case "in":
+            return v in value
+        case "not_in":
+            return v not in value
+        case "between":
+            return value[0] <= v <= value[1]
+
+
+def test_planner_matches_a_brute_force_filter():
+    rng = random.Random(3)
+
+    for _ in range(20):
+        frame = make_frame(rng, rng.randint(0, 60))
+        stats = {p: ColumnStats(frame[p]) for p in frame.columns}
+        rows = frame.to_dict("records")
+
+        for _ in range(25):
+            query = [make_query(rng) for _ in range(rng.randint(1, 3))]
+            expected = [
+                i for i, row in enumerate(rows) if all(matches(row, q) for q in query)
+            ]
+
+            found = execute(query, frame, stats)
+            assert np.array_equal(found, expected), query
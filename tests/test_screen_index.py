@@ -0,0 +1,37 @@
+import pytest
+
+from src.cache import CacheStore
+from src.screen_index import ScreenIndex, PARALLEL_MIN_ENTRIES
+
+
+def test_worker_processes_extract_the_same_rows(tmp_path):
+    store = CacheStore(str(tmp_path), 60 * 60)
+    for i in range(PARALLEL_MIN_ENTRIES + 10):
+        result = {"summaryDetail": {"dividendYield": {"raw": i / 1000}}}
+        store.write(
+            f"ticker_S{i}", {"quoteSummary": {"result": [result]}, "fetchedAt": {}}
+        )
+
+    paths = ["summaryDetail.dividendYield.raw"]
+    serial = ScreenIndex(str(tmp_path), paths, "serial.pkl", workers=1)
+    parallel = ScreenIndex(str(tmp_path), paths, "parallel.pkl", workers=2)
+
+    assert serial.refresh() and parallel.refresh()
+    assert parallel.rows == serial.rows
+    assert parallel.rows["ticker_S42"][1]["summaryDetail.dividendYield.raw"] == 0.042
+
+
+def test_query_without_extend_rejects_unknown_paths(tmp_path):
+    store = CacheStore(str(tmp_path), 60 * 60)
+    result = {"summaryDetail": {"dividendYield": {"raw": 0.02}}}
+    store.write("ticker_AAPL", {"quoteSummary": {"result": [result]}, "fetchedAt": {}})
+
+    index = ScreenIndex(str(tmp_path), ["summaryDetail.dividendYield.raw"])
+    query = [("summaryDetail.dividendYield.raw", "gt", 0.01)]
+    assert index.query(query, extend=False)["symbol"].tolist() == ["AAPL"]
+
+    with pytest.raises(AssertionError, match="Unknown paths price.exchange"):
+        index.query(query, fields=["price.exchange"], extend=False)
+
+    assert index.paths == ["summaryDetail.dividendYield.raw"]
+    assert len(index.rows) == 1
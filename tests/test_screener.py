@@ -0,0 +1,29 @@
+from pathlib import Path
+
+from src.screener import Screener
+
+
+def test_scrape_fills_the_screener_cache_folder(stub_yahoo, tmp_path, monkeypatch):
+    url, requests = stub_yahoo
+    monkeypatch.chdir(tmp_path)
+
+    cache_folder = str(tmp_path / "data")
+    screener = Screener(cache_folder, workers=1, query1_url=url, query2_url=url)
+
+    report = screener.scrape(concurrency=4, rate_limit=None, indices="DOW JONES")
+    symbols = screener.universe.symbols("DOW JONES")
+
+    assert report.ok
+    assert len(requests) == len(symbols)
+    assert not (tmp_path / "cache").exists()
+
+    table = screener.query(
+        [("summaryDetail.dividendYield.raw", "gt", 0.01)],
+        fields={"PE": "summaryDetail.trailingPE.raw"},
+        sort="symbol",
+        indices="DOW JONES",
+    )
+
+    assert table["symbol"].tolist() == sorted(symbols)
+    assert (table["PE"] == 20.0).all()
+    assert any(Path(cache_folder).glob("ticker_*"))
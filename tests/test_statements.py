@@ -0,0 +1,100 @@
+from src.statements import BALANCE_SHEET, CASH_FLOW, INCOME_STATEMENT
+from src.utils import safeget
+
+
+# Output name -> Yahoo key of every field the baseline statements returned
+BASELINE = {
+    INCOME_STATEMENT: {
+        "date": "endDate",
+        "total_revenue": "totalRevenue",
+        "cost_of_revenue": "costOfRevenue",
+        "gross_profit": "grossProfit",
+        "research_development": "researchDevelopment",
+        "selling_general_administrative": "sellingGeneralAdministrative",
+        "total_operating_expenses": "totalOperatingExpenses",
+        "operating_income": "operatingIncome",
+        "total_other_income_expense_net": "totalOtherIncomeExpenseNet",
+        "ebit": "ebit",
+        "interest_expense": "interestExpense",
+        "income_before_tax": "incomeBeforeTax",
+        "income_tax_expense": "incomeTaxExpense",
+        "net_income_from_continuing_ops": "netIncomeFromContinuingOps",
+        "net_income": "netIncome",
+        "net_income_applicable_to_common_shares": "netIncomeApplicableToCommonShares",
+    },
+    BALANCE_SHEET: {
+        "date": "endDate",
+        "cash": "cash",
+        "short_term_investments": "shortTermInvestments",
+        "net_receivables": "netReceivables",
+        "inventory": "inventory",
+        "other_current_assets": "otherCurrentAssets",
+        "total_current_assets": "totalCurrentAssets",
+        "long_term_investments": "longTermInvestments",
+        "property_plant_equipment": "propertyPlantEquipment",
+        "other_assets": "otherAssets",
+        "total_assets": "totalAssets",
+        "accounts_payable": "accountsPayable",
+        "short_long_term_debt": "shortLongTermDebt",
+        "other_current_liab": "otherCurrentLiab",
+        "long_term_debt": "longTermDebt",
+        "other_liab": "otherLiab",
+        "total_current_liabilities": "totalCurrentLiabilities",
+        "total_liab": "totalLiab",
+        "common_stock": "commonStock",
+        "retained_earnings": "retainedEarnings",
+        "treasury_stock": "treasuryStock",
+        "other_stockholder_equity": "otherStockholderEquity",
+        "total_stockholder_equity": "totalStockholderEquity",
+        "net_tangible_assets": "netTangibleAssets",
+    },
+    CASH_FLOW: {
+        "date": "endDate",
+        "net_income": "netIncome",
+        "depreciation": "depreciation",
+        "change_to_net_income": "changeToNetincome",
+        "change_to_account_receivables": "changeToAccountReceivables",
+        "change_to_liabilities": "changeToLiabilities",
+        "change_to_inventory": "changeToInventory",
+        "change_to_operating_activities": "changeToOperatingActivities",
+        "total_cash_from_operating_activities": "totalCashFromOperatingActivities",
+        "capital_expenditures": "capitalExpenditures",
+        "investments": "investments",
+        "other_cashflows_from_investing_activities": "otherCashflowsFromInvestingActivities",
+        "total_cashflows_from_investing_activities": "totalCashflowsFromInvestingActivities",
+        "dividends_paid": "dividendsPaid",
+        "net_borrowings": "netBorrowings",
+        "other_cashflows_from_financing_activities": "otherCashflowsFromFinancingActivities",
+        "total_cash_from_financing_activities": "totalCashFromFinancingActivities",
+        "change_in_cash": "changeInCash",
+        "repurchase_of_stock": "repurchaseOfStock",
+    },
+}
+
+
+def test_schemas_return_the_baseline_fields():
+    for schema, fields in BASELINE.items():
+        statement = {
+            key: {"raw": i, "fmt": f"fmt {i}"} for i, key in enumerate(fields.values())
+        }
+        # Fields Yahoo left out are reported as missing
+        del statement[list(fields.values())[-1]]
+
+        expected = {
+            name: safeget(statement, key, "fmt" if name == "date" else "raw")
+            for name, key in fields.items()
+        }
+
+        rows = schema.rows({schema.list_key: [statement]})
+        assert rows == [expected]
+        assert list(rows[0]) == list(fields)
+        assert schema.columns(rows) == {k: [v] for k, v in expected.items()}
+
+
+def test_quarterly_statements_use_the_quarterly_modules():
+    assert INCOME_STATEMENT.modules == {
+        "annual": "incomeStatementHistory",
+        "quarterly": "incomeStatementHistoryQuarterly",
+    }
+    assert BALANCE_SHEET.rows({}) is None
+    assert CASH_FLOW.rows(None) is None
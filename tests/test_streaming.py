@@ -0,0 +1,28 @@
+import asyncio
+
+from api.streaming import aiter_completed
+
+
+def test_aiter_completed_keeps_the_window_in_flight():
+    running, peak = 0, 0
+
+    async def compute(item: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (item % 3))
+        running -= 1
+
+        if item == 7:
+            raise ValueError("failed")
+        return item * 2
+
+    async def collect():
+        return [row async for row in aiter_completed(compute, range(20), window=4)]
+
+    rows = asyncio.run(collect())
+
+    assert peak == 4
+    assert sorted(item for item, _, _ in rows) == list(range(20))
+    assert all(res == item * 2 for item, res, err in rows if err is None)
+    assert [item for item, _, err in rows if err is not None] == [7]
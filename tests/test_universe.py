@@ -0,0 +1,39 @@
+from pytickersymbols import PyTickerSymbols
+
+from src.universe import Universe
+
+
+def baseline_ftse_100(markets):
+    # As the screener listed them before the universe registry
+    return [
+        s["yahoo"]
+        for stock in markets.get_stocks_by_index("FTSE 100")
+        for s in stock["symbols"]
+        if s["currency"] == "GBP"
+    ]
+
+
+def baseline_snp_500(markets):
+    return [s["symbol"] for s in markets.get_stocks_by_index("S&P 500")]
+
+
+def test_constituents_match_the_baseline_lists(tmp_path):
+    markets = PyTickerSymbols()
+    universe = Universe(str(tmp_path))
+
+    ftse = universe.symbols("FTSE 100")
+    assert ftse == list(dict.fromkeys(baseline_ftse_100(markets)))
+    assert {"SHEL.L", "SDRC.L", "RKT.L", "LSEG.L"} <= set(ftse)
+    assert all(s.endswith(".L") for s in ftse)
+
+    snp = universe.symbols("S&P 500")
+    assert snp == list(dict.fromkeys(baseline_snp_500(markets)))
+    assert universe.currency("LSEG.L") == "GBP"
+
+
+def test_a_warm_start_reads_the_persisted_maps(tmp_path):
+    universe = Universe(str(tmp_path))
+    warm = Universe(str(tmp_path))
+
+    assert warm.indices == universe.indices
+    assert warm.yahoo_symbol("LSE", "FTSE 100") in {"LSE.L", "LSEG.L"}
@@ -0,0 +1,116 @@
+import os
+import time
+import fakeredis
+
+from src import cache, warmer
+from src.cache import LRUCache
+from src.cache_backends import RedisBackend
+from src.warmer import CacheWarmer, FetchedIndex, WarmerLease
+from src.yahoo_finance import (
+    read_ticker_entry,
+    write_ticker_modules,
+    CacheStores,
+    YahooFinance,
+)
+
+
+def test_a_single_process_holds_the_lease():
+    backend = RedisBackend(client=fakeredis.FakeRedis())
+    first, second = WarmerLease(backend, 60), WarmerLease(backend, 60)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()
+
+    # Expired, as when its holder stopped renewing it
+    backend.delete(first.key)
+    assert second.acquire()
+    assert not first.acquire()
+
+
+def test_fetched_index_only_reads_entries_written_since_the_last_scan(
+    tmp_path, monkeypatch
+):
+    stores = CacheStores(str(tmp_path))
+    write_ticker_modules("AAPL", None, {"price": {}}, ["price"], stores)
+
+    reads = []
+    read_ticker_entry = warmer.read_ticker_entry
+
+    def counted(symbol, stores):
+        reads.append(symbol)
+        return read_ticker_entry(symbol, stores)
+
+    monkeypatch.setattr(warmer, "read_ticker_entry", counted)
+
+    index = FetchedIndex(stores)
+    for _ in range(3):
+        index.refresh()
+        assert list(index.get("AAPL")) == ["price"]
+        assert index.get("MSFT") == {}
+
+    assert reads == ["AAPL"]
+
+    # Rewritten by another process a second later
+    write_ticker_modules("AAPL", None, {"assetProfile": {}}, ["assetProfile"], stores)
+    path = stores.tickers.backend.path(stores.tickers.entry("ticker_AAPL"))
+    mtime = path.stat().st_mtime + 1
+    os.utime(path, (mtime, mtime))
+
+    index.refresh()
+    assert list(index.get("AAPL")) == ["assetProfile"]
+    assert reads == ["AAPL", "AAPL"]
+
+
+def test_the_lease_holder_ranks_the_popularity_of_every_process(tmp_path):
+    first = CacheWarmer(str(tmp_path), indices=[])
+    second = CacheWarmer(str(tmp_path), indices=[])
+
+    first.record("AAPL", modules=["price"])
+    second.record("AAPL", dividends=True)
+    second.record("MSFT", interval="1d")
+
+    now = time.time()
+    first.publish(now)
+    second.publish(now)
+
+    hot = {symbol: (score, set(r)) for symbol, score, r in first.hottest(now)}
+
+    assert hot["AAPL"][1] == {("module", "price"), ("dividends", "")}
+    assert hot["AAPL"][0] > hot["MSFT"][0]
+    assert hot["MSFT"][1] == {("prices", "1d")}
+
+
+def test_other_workers_serve_the_warmed_entry(stub_yahoo, tmp_path, monkeypatch):
+    url, requests = stub_yahoo
+    stores = CacheStores(str(tmp_path))
+    yf = YahooFinance(
+        query1_url=url, query2_url=url, rate_limit=None, cache_dir=str(tmp_path)
+    )
+
+    # Each worker process has its own memory tier
+    def worker(memory: LRUCache) -> None:
+        monkeypatch.setattr(cache, "memory_cache", memory)
+
+    warmer_memory, reader_memory = LRUCache(1 << 20), LRUCache(1 << 20)
+
+    worker(reader_memory)
+    stale = time.time() - warmer.CACHE_TTL_SEC - 60
+    entry = {"quoteSummary": {"result": [{}], "error": None}, "fetchedAt": {}}
+    entry["fetchedAt"]["assetProfile"] = stale
+    stores.tickers.write("ticker_AAPL", entry)
+
+    # Written a while before the warmer runs, creation times are in seconds
+    path = stores.tickers.backend.path(stores.tickers.entry("ticker_AAPL"))
+    os.utime(path, (time.time() - 10, time.time() - 10))
+    assert read_ticker_entry("AAPL", stores)["fetchedAt"]["assetProfile"] == stale
+
+    worker(warmer_memory)
+    yf.refresh_ticker_modules("AAPL", ["assetProfile"])
+    assert len(requests) == 1
+
+    worker(reader_memory)
+    profile = yf.get_ticker_modules("AAPL", ["assetProfile"])
+
+    assert profile["fetchedAt"]["assetProfile"] > stale
+    assert len(requests) == 1